@@ -0,0 +1,154 @@
+"""
+Batch analysis: one position per input line, one JSON result per output line, in input order.
+
+Input lines are either a move string of 1-based columns ("4453"), or a JSON object with
+"moves" (same string) or "position" and "mask" (bitboards), and an optional "id".
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, TextIO
+from int_board import IntBoard
+from solver import Solver
+
+# One long-lived Solver per worker process
+_worker_solver: Optional[Solver] = None
+
+def _init_worker(tt_size_bytes: int, tt_path: Optional[str] = None):
+    "Process pool initializer: build the worker's Solver, warm-started from tt_path if given"
+    global _worker_solver
+    _worker_solver = Solver(IntBoard, tt_size_bytes=tt_size_bytes if tt_path is None else 1024 * 1024)
+    _worker_solver.verbose = False
+    if tt_path is not None: # Mapped copy-on-write: workers share the file's pages until they store into them
+        _worker_solver.load_table(tt_path)
+
+def parse_line(line: str) -> dict:
+    "Turn one input line into a request dict with 'moves' or 'position'/'mask'"
+    line = line.strip()
+    if line.startswith('{'):
+        return json.loads(line)
+    return {'moves': line}
+
+def bitboard_error(position: int, mask: int) -> Optional[str]:
+    "Why (position, mask) is not a reachable-looking position, or None if it is"
+    if mask < 0 or position < 0 or mask & ~IntBoard.board_mask:
+        return "mask has bits outside the board"
+    if position & ~mask:
+        return "position must be a subset of mask"
+    column_bits = (1 << (IntBoard.HEIGHT + 1)) - 1
+    for col in range(IntBoard.WIDTH):
+        column = (mask >> (col * (IntBoard.HEIGHT + 1))) & column_bits
+        if column & (column + 1): # Not of the form 0..01..1
+            return f"column {col + 1} is not filled from the bottom up"
+    if bin(position).count('1') != bin(mask).count('1') // 2: # The player to move has made half the moves, rounded down
+        return "stone counts do not match the player to move"
+    return None
+
+def board_from_request(request: dict):
+    "Board of a request dict, return (board, None) or (None, error message)"
+    board = IntBoard()
+    if 'moves' in request:
+        moves = str(request['moves'])
+        if board.play_sequence(moves) != len(moves):
+            return None, "invalid move sequence"
+    elif 'position' in request and 'mask' in request:
+        try:
+            position, mask = int(request['position']), int(request['mask'])
+        except (ValueError, TypeError, OverflowError): # OverflowError: json.loads accepts Infinity
+            return None, "'position' and 'mask' must be integers"
+        error = bitboard_error(position, mask)
+        if error is not None:
+            return None, error
+        board.set_position(position, mask)
+    else:
+        return None, "expected 'moves' or 'position' and 'mask'"
+    return board, None
+
+def solve_fields(solver: Solver, board: IntBoard, depth: int, time_limit: Optional[float]) -> dict:
+    "Solve one position, return the answer fields of a result record"
+    start = time.perf_counter()
+    score, move = solver.solve(board, depth, time_limit=time_limit)
+    column = solver.get_col_from_move(move)
+    return {
+        'score': int(score) if score != float('-inf') else None,
+        'best_move': column + 1 if column != -1 else None, # 1-based, like the move strings
+        'depth': solver.last_completed_depth,
+        'exact': solver.last_solve_exact,
+        'nodes': solver.node_count,
+        'time': round(time.perf_counter() - start, 6),
+    }
+
+def analyze(request: dict, depth: int, time_limit: Optional[float]) -> dict:
+    "Worker task: solve one position and return its result record"
+    result = {'id': request['id']} if 'id' in request else {}
+    if 'moves' in request:
+        result['moves'] = str(request['moves'])
+    board, error = board_from_request(request)
+    if error is not None:
+        result['error'] = error
+        return result
+    result.update(solve_fields(_worker_solver, board, depth, time_limit))
+    return result
+
+def run_batch(lines: Iterator[str], out: TextIO, depth: int, time_limit: Optional[float],
+              workers: Optional[int] = None, tt_size_bytes: int = 64 * 1024 * 1024, max_in_flight: Optional[int] = None,
+              tt_path: Optional[str] = None):
+    "Stream lines through a process pool, keeping at most max_in_flight positions in memory"
+    "tt_path: saved trans table every worker starts from (then tt_size_bytes is ignored)"
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tt_size_bytes, tt_path)) as pool:
+        pending = deque()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                request = parse_line(line)
+            except json.JSONDecodeError as e:
+                pending.append(({}, {'error': f"bad JSON: {e}"}))
+            else:
+                pending.append((request, pool.submit(analyze, request, depth, time_limit)))
+            while len(pending) >= max_in_flight: # Write in input order as soon as the oldest is done
+                _write(out, *pending.popleft())
+        while pending:
+            _write(out, *pending.popleft())
+
+def _write(out: TextIO, request: dict, item):
+    "Write one result record (a future or an already built error record); a failed task becomes an error record"
+    if isinstance(item, dict):
+        record = item
+    else:
+        try:
+            record = item.result()
+        except Exception as e: # One bad record must not stop the stream
+            record = {'id': request['id']} if isinstance(request, dict) and 'id' in request else {}
+            record['error'] = f"analysis failed: {e!r}"
+    out.write(json.dumps(record) + "\n")
+    out.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Score positions from a file (or stdin) as JSON lines")
+    parser.add_argument('input', nargs='?', default='-', help="positions file, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="results file, '-' for stdout")
+    parser.add_argument('--depth', type=int, default=10, help="depth budget per position")
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds per position")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--tt-mb', type=int, default=64, help="trans table size per worker, MiB")
+    parser.add_argument('--tt-file', default=None, help="saved trans table to warm-start the workers from")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        run_batch(source, out, args.depth, args.time_limit, args.workers, args.tt_mb * 1024 * 1024, tt_path=args.tt_file)
+    finally:
+        if source is not sys.stdin: source.close()
+        if out is not sys.stdout: out.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import time
+from bench_common import POSITIONS, make_board, new_solver
+from int_board import IntBoard
+
+SETTINGS = {'exact_from_ply': None} # Same search on both sides
+
+def per_column_solves(seq: str, depth: int, shared: bool):
+    "Today's way to score every column: one solve() per child position, return ({col: score}, nodes, seconds)"
+    "shared: one Solver (and trans table) for all the solves, else a new one each"
+    solver = new_solver(IntBoard, SETTINGS)
+    board = make_board(IntBoard, seq)
+    scores = {}
+    nodes = 0
+    start = time.perf_counter()
+    for col in range(board.WIDTH):
+        if not board.can_play(col):
+            continue
+        child = board.copy()
+        child.play_col(col)
+        if child.has_won(child.current_position ^ child.mask):
+            scores[col] = solver.SCORE_WINNING_MOVE
+            continue
+        if not shared:
+            solver = new_solver(IntBoard, SETTINGS)
+        score, _ = solver.solve(child, depth - 1)
+        scores[col] = -score
+        nodes += solver.node_count
+    return scores, nodes, time.perf_counter() - start
+
+def analyze(seq: str, depth: int, top_k=None):
+    "Solver.analyze, return ({col: score}, nodes, seconds)"
+    solver = new_solver(IntBoard, SETTINGS)
+    start = time.perf_counter()
+    results = solver.analyze(make_board(IntBoard, seq), depth, top_k=top_k)
+    return {result.col: result.score for result in results}, solver.node_count, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Solver.analyze with one solve() per column")
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--top-k', type=int, default=2)
+    args = parser.parse_args()
+
+    totals = {'new solvers': [0, 0.0], 'one solver': [0, 0.0], 'analyze': [0, 0.0], f'top {args.top_k}': [0, 0.0]}
+    agree = columns = top_agree = 0
+    for seq in POSITIONS:
+        _, *fresh_cost = per_column_solves(seq, args.depth, False)
+        reference, *solves_cost = per_column_solves(seq, args.depth, True)
+        scores, *analyze_cost = analyze(seq, args.depth)
+        top, *top_cost = analyze(seq, args.depth, args.top_k)
+        for name, (nodes, seconds) in zip(totals, (fresh_cost, solves_cost, analyze_cost, top_cost)):
+            totals[name][0] += nodes
+            totals[name][1] += seconds
+        columns += len(reference)
+        agree += sum(scores.get(col) == score for col, score in reference.items())
+        best = sorted(scores.values(), reverse=True)[:args.top_k]
+        top_agree += sorted(top.values(), reverse=True) == best
+        print(f"'{seq}': {' '.join(f'{col + 1}:{score}' for col, score in sorted(scores.items()))}")
+
+    for name, (nodes, seconds) in totals.items():
+        print(f"{name:>11}: {nodes:>8} nodes, {seconds:.2f}s")
+    print(f"Scores equal to the per-column solves: {agree}/{columns} columns")
+    print(f"Top {args.top_k} scores equal to the full analysis: {top_agree}/{len(POSITIONS)} positions")
+
+if __name__ == "__main__":
+    main()
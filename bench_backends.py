@@ -0,0 +1,23 @@
+import argparse
+from bench_common import solve_positions
+from board import Board
+from int_board import IntBoard
+
+BACKENDS = {'numpy': Board, 'int': IntBoard}
+
+def main():
+    parser = argparse.ArgumentParser(description="Nodes/sec micro-benchmark of the board backends")
+    parser.add_argument('--depth', type=int, default=6)
+    args = parser.parse_args()
+
+    reference = None
+    for name, board_class in BACKENDS.items():
+        nodes, seconds, results, _ = solve_positions(board_class, args.depth)
+        print(f"{name:>6}: {nodes} nodes in {seconds:.2f}s -> {nodes / seconds:,.0f} nodes/sec")
+        if reference is None:
+            reference = results
+        elif results != reference:
+            print(f"  WARNING: {name} results differ from reference: {results} != {reference}")
+
+if __name__ == "__main__":
+    main()
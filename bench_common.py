@@ -0,0 +1,60 @@
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from solver import Solver
+
+# Opening / middle-game positions given as 1-based column sequences
+POSITIONS = [
+    "",
+    "44",
+    "4453",
+    "4444",
+    "3452416",
+    "44444433",
+]
+
+class BenchRun(NamedTuple):
+    "Totals of one solve_positions() run"
+    nodes: int
+    seconds: float
+    results: List[Tuple[int, int]] # (score, 0-based col) per position
+    counters: dict # Solver counter name -> total, list counters are summed per index
+
+def make_board(board_class, seq):
+    "Build a board of the given backend from a 1-based column sequence"
+    board = board_class()
+    for ch in seq:
+        board.play_col(int(ch) - 1)
+    return board
+
+def new_solver(board_class, settings: Optional[dict] = None, **solver_args) -> Solver:
+    "Quiet Solver with the given attributes set (settings: attribute name -> value)"
+    solver = Solver(board_class, **solver_args)
+    solver.verbose = False
+    for name, value in (settings or {}).items():
+        setattr(solver, name, value)
+    return solver
+
+def solve_positions(board_class, depth: int, settings: Optional[dict] = None, counters: Sequence[str] = (),
+                    positions: Sequence[str] = POSITIONS) -> BenchRun:
+    "Solve every position with a new Solver under settings, return the summed nodes, seconds and counters"
+    nodes = 0
+    seconds = 0.0
+    results = []
+    totals = {}
+    for seq in positions:
+        solver = new_solver(board_class, settings)
+        board = make_board(board_class, seq)
+        start = time.perf_counter()
+        score, move = solver.solve(board, depth)
+        seconds += time.perf_counter() - start
+        nodes += solver.node_count
+        results.append((score, solver.get_col_from_move(move)))
+        for name in counters:
+            value = getattr(solver, name)
+            if name not in totals:
+                totals[name] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                totals[name] = [total + v for total, v in zip(totals[name], value)]
+            else:
+                totals[name] += value
+    return BenchRun(nodes, seconds, results, totals)
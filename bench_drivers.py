@@ -0,0 +1,23 @@
+import argparse
+from bench_common import solve_positions
+from eval_board import EvalBoard
+
+DRIVERS = ('pvs', 'aspiration', 'mtdf')
+
+def main():
+    parser = argparse.ArgumentParser(description="Node counts of the iterative deepening drivers")
+    parser.add_argument('--depth', type=int, default=9)
+    args = parser.parse_args()
+
+    reference = None
+    for driver in DRIVERS:
+        run = solve_positions(EvalBoard, args.depth, {'search_driver': driver}, counters=('driver_searches',))
+        scores = [score for score, _ in run.results]
+        print(f"{driver:>10}: {run.nodes} nodes, {run.counters['driver_searches']} root searches, {run.seconds:.2f}s")
+        if reference is None:
+            reference = scores
+        elif scores != reference:
+            print(f"  WARNING: scores differ from pvs: {scores} != {reference}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import time
+from bench_common import POSITIONS, make_board, new_solver
+from eval_board import EvalBoard
+from int_board import IntBoard
+
+BACKENDS = {'int': IntBoard, 'eval': EvalBoard}
+# name -> Solver attributes to set; both engines must agree under each of them
+CONFIGS = {
+    'threats': {},
+    'history': {'move_ordering': 'history'},
+    'mtdf': {'search_driver': 'mtdf'},
+    'no pruning': {'prune_losing_moves': False},
+}
+
+def run(board_class, engine: str, settings: dict, seq: str, depth: int):
+    "Solve and evaluate one position with one engine, return ((score, move, eval score, nodes, cutoffs), seconds)"
+    # Compare the engines, not the exact solver
+    solver = new_solver(board_class, {'exact_from_ply': None, 'search_engine': engine, **settings})
+    board = make_board(board_class, seq)
+    start = time.perf_counter()
+    score, move = solver.solve(board, depth)
+    nodes, cutoffs = solver.node_count, solver.beta_cutoffs
+    solver.clear_cache()
+    eval_score, _ = solver.evaluate(board, depth - 2)
+    seconds = time.perf_counter() - start
+    return (score, move, eval_score, nodes + solver.node_count, cutoffs + solver.beta_cutoffs), seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the iterative negamax against the recursive one and compare nodes/sec")
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--backends', nargs='*', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--configs', nargs='*', choices=CONFIGS, default=list(CONFIGS))
+    args = parser.parse_args()
+
+    mismatches = 0
+    for backend in args.backends:
+        for config in args.configs:
+            nodes = 0
+            seconds = {'recursive': 0.0, 'iterative': 0.0}
+            for seq in POSITIONS:
+                results = {}
+                for engine in seconds:
+                    results[engine], elapsed = run(BACKENDS[backend], engine, CONFIGS[config], seq, args.depth)
+                    seconds[engine] += elapsed
+                nodes += results['recursive'][3]
+                if results['recursive'] != results['iterative']:
+                    mismatches += 1
+                    print(f"  MISMATCH '{seq}' (score, move, eval score, nodes, cutoffs): {results}")
+            rates = {engine: nodes / elapsed for engine, elapsed in seconds.items()}
+            print(f"{backend:>4} {config:>10}: {nodes} nodes, recursive {rates['recursive']:,.0f} n/s, "
+                  f"iterative {rates['iterative']:,.0f} n/s ({rates['iterative'] / rates['recursive']:.2f}x)")
+    print("Engines agree" if not mismatches else f"{mismatches} positions differ")
+    if mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
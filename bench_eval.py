@@ -0,0 +1,87 @@
+import argparse
+import random
+import time
+from bench_common import solve_positions
+from eval_board import EvalBoard
+from int_board import IntBoard
+from solver import Solver
+
+def random_positions(count, seed):
+    "Random reachable positions (bitboards) from random games, at every ply"
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = IntBoard()
+        while board.nb_moves() < board.WIDTH * board.HEIGHT:
+            cols = [c for c in range(board.WIDTH) if board.can_play(c)]
+            col = rng.choice(cols)
+            if board.is_winning_move(col):
+                break
+            board.play_col(col)
+            positions.append((board.current_position, board.mask))
+    return positions[:count]
+
+def check_equal(count, seed):
+    "Property check: incremental evaluation == Solver.heuristic, also after play/unplay round trips"
+    rng = random.Random(seed)
+    scalar = Solver(IntBoard)
+    incremental = Solver(EvalBoard)
+    for position, mask in random_positions(count, seed):
+        board = IntBoard()
+        board.set_position(position, mask)
+        eval_board = EvalBoard()
+        eval_board.set_position(position, mask)
+        expected = scalar.heuristic(board)
+        assert incremental.heuristic(eval_board) == expected, (position, mask)
+
+        possible = eval_board.possible()
+        if possible:
+            moves = [possible & IntBoard.column_mask(c) for c in range(IntBoard.WIDTH) if possible & IntBoard.column_mask(c)]
+            move = rng.choice(moves)
+            eval_board.play(move)
+            board.play(move)
+            assert incremental.heuristic(eval_board) == scalar.heuristic(board), (position, mask, move)
+            eval_board.unplay(move)
+            assert incremental.heuristic(eval_board) == expected, (position, mask, move)
+
+def time_leaves(count, seed):
+    "Seconds per leaf evaluation for the scalar and incremental versions"
+    positions = random_positions(count, seed)
+    results = {}
+    for name, board_class in (('scalar', IntBoard), ('incremental', EvalBoard)):
+        solver = Solver(board_class)
+        boards = []
+        for position, mask in positions:
+            board = board_class()
+            board.set_position(position, mask)
+            boards.append(board)
+        start = time.perf_counter()
+        for board in boards:
+            solver.heuristic(board)
+        results[name] = (time.perf_counter() - start) / len(boards)
+    return results
+
+def time_search(depth):
+    "nodes/sec of full searches over the benchmark positions"
+    results = {}
+    for name, board_class in (('scalar', IntBoard), ('incremental', EvalBoard)):
+        run = solve_positions(board_class, depth)
+        results[name] = run.nodes / run.seconds
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the incremental heuristic against Solver.heuristic")
+    parser.add_argument('--positions', type=int, default=20000)
+    parser.add_argument('--depth', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    check_equal(args.positions, args.seed)
+    print(f"incremental == scalar heuristic on {args.positions} random positions (with play/unplay)")
+    for name, seconds in time_leaves(args.positions, args.seed).items():
+        print(f"{name:>11} leaf eval: {seconds * 1e6:.2f} us")
+    for name, rate in time_search(args.depth).items():
+        print(f"{name:>11} search: {rate:,.0f} nodes/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import argparse
+from bench_common import solve_positions
+from eval_board import EvalBoard
+
+# name -> Solver attributes to set
+CONFIGS = {
+    'center': {'move_ordering': 'center'},
+    'killers+history': {'move_ordering': 'history'},
+    'threats': {'move_ordering': 'threats'},
+    'threats, no extension': {'move_ordering': 'threats', 'extend_forced_moves': False},
+    'threats, no pruning': {'move_ordering': 'threats', 'prune_losing_moves': False},
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare move ordering and pruning strategies")
+    parser.add_argument('--depth', type=int, default=9)
+    args = parser.parse_args()
+
+    for name, settings in CONFIGS.items():
+        run = solve_positions(EvalBoard, args.depth, settings, counters=('beta_cutoffs', 'cutoff_move_index'))
+        cutoffs, first_move = run.counters['beta_cutoffs'], run.counters['cutoff_move_index'][0]
+        rate = first_move / cutoffs if cutoffs else 0.0
+        print(f"{name:>16}: {run.nodes} nodes, first-move cutoff rate {rate:.1%} ({cutoffs} cutoffs), {run.seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
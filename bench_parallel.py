@@ -0,0 +1,37 @@
+import argparse
+import time
+from bench_common import POSITIONS, make_board, new_solver
+from int_board import IntBoard
+from parallel_solver import ParallelSolver
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ParallelSolver with the serial Solver.solve (nodes and time)")
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    totals = {'serial': [0, 0.0], 'parallel': [0, 0.0]}
+    with ParallelSolver(IntBoard, workers=args.workers) as parallel:
+        for seq in POSITIONS:
+            serial = new_solver(IntBoard, {'exact_from_ply': None}) # Both sides run the heuristic search
+            board = make_board(IntBoard, seq)
+            start = time.perf_counter()
+            serial_result = serial.solve(board, args.depth)
+            serial_time = time.perf_counter() - start
+            if parallel.table is not None: # Cold start, like the new serial Solver
+                parallel.table.clear()
+            start = time.perf_counter()
+            parallel_result = parallel.solve(board, args.depth)
+            parallel_time = time.perf_counter() - start
+            totals['serial'][0] += serial.node_count
+            totals['serial'][1] += serial_time
+            totals['parallel'][0] += parallel.node_count
+            totals['parallel'][1] += parallel_time
+            print(f"'{seq}': serial {serial.node_count} nodes {serial_time:.2f}s (score {serial_result[0]}, "
+                  f"col {serial.get_col_from_move(serial_result[1]) + 1}), parallel {parallel.node_count} nodes "
+                  f"{parallel_time:.2f}s (score {parallel_result[0]}, col {serial.get_col_from_move(parallel_result[1]) + 1})")
+    for name, (nodes, seconds) in totals.items():
+        print(f"{name:>8}: {nodes} nodes, {seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Perft for the board backends: count every game continuation to a fixed depth, check the bitboard
+primitives against a slow grid-based reference, and measure raw move throughput.
+
+  python bench_perft.py --depth 6              # counts and moves/sec per backend
+  python bench_perft.py --depth 4 --validate   # also check every node against the reference
+
+A leaf is a position at the requested depth or a game that ended earlier. Leaves are split into
+wins (the last move made four in a row), draws (full board) and open positions.
+"""
+
+import argparse
+import time
+from typing import List, NamedTuple, Optional
+from board import Board
+from bench_common import POSITIONS, make_board
+from eval_board import EvalBoard
+from int_board import IntBoard
+
+BACKENDS = {'numpy': Board, 'int': IntBoard, 'eval': EvalBoard}
+# The benchmark positions plus middle games where wins (diagonal ones too) come within a few plies
+PERFT_POSITIONS = POSITIONS + ["16221436357572", "5327264754553512"]
+
+W = Board.WIDTH
+H = Board.HEIGHT
+H1 = H + 1
+SIZE = W * H
+
+class PerftCounts(NamedTuple):
+    leaves: int
+    wins: int
+    draws: int
+    moves: int  # play() calls made
+
+    def __add__(self, other):
+        return PerftCounts(*(a + b for a, b in zip(self, other)))
+
+NO_LEAVES = PerftCounts(0, 0, 0, 0)
+
+def perft(board, depth: int) -> PerftCounts:
+    "Count the leaves under board with play/unplay, a win ends the game"
+    if board.nb_moves() >= SIZE:
+        return PerftCounts(1, 0, 1, 0)
+    if depth == 0:
+        return PerftCounts(1, 0, 0, 0)
+    leaves = wins = draws = moves = 0
+    possible = board.possible()
+    while possible:
+        move = possible & -possible
+        possible ^= move
+        board.play(move)
+        moves += 1
+        if board.has_won(board.current_position ^ board.mask): # The player who just moved
+            leaves += 1
+            wins += 1
+        else:
+            sub = perft(board, depth - 1)
+            leaves += sub.leaves
+            wins += sub.wins
+            draws += sub.draws
+            moves += sub.moves
+        board.unplay(move)
+    return PerftCounts(leaves, wins, draws, moves)
+
+# Slow reference: a list of columns of 0/1 stones (0 moves first), no bit tricks
+
+def grid_from_sequence(seq: str) -> List[List[int]]:
+    "Columns bottom-up of the stones of a 1-based move sequence"
+    grid = [[] for _ in range(W)]
+    for i, ch in enumerate(seq):
+        grid[int(ch) - 1].append(i & 1)
+    return grid
+
+def grid_cell(grid, col: int, row: int) -> Optional[int]:
+    "Stone at (col, row) or None"
+    if 0 <= col < W and 0 <= row < len(grid[col]):
+        return grid[col][row]
+    return None
+
+def reference_has_won(grid, player: int) -> bool:
+    "Scan every cell and direction for four stones of player"
+    for col in range(W):
+        for row in range(H):
+            for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                if all(grid_cell(grid, col + k * dc, row + k * dr) == player for k in range(4)):
+                    return True
+    return False
+
+def reference_perft(grid, depth: int, nb_moves: int) -> PerftCounts:
+    "perft() on the grid, with the reference win detector"
+    if nb_moves >= SIZE:
+        return PerftCounts(1, 0, 1, 0)
+    if depth == 0:
+        return PerftCounts(1, 0, 0, 0)
+    total = NO_LEAVES
+    player = nb_moves & 1
+    for col in range(W):
+        if len(grid[col]) < H:
+            grid[col].append(player)
+            if reference_has_won(grid, player):
+                total += PerftCounts(1, 1, 0, 1)
+            else:
+                total += reference_perft(grid, depth - 1, nb_moves + 1) + PerftCounts(0, 0, 0, 1)
+            grid[col].pop()
+    return total
+
+def bit(col: int, row: int) -> int:
+    return 1 << (col * H1 + row)
+
+def reference_masks(grid, nb_moves: int):
+    "Bitboards of the grid computed cell by cell: (current player's stones, all stones)"
+    player = nb_moves & 1
+    current = mask = 0
+    for col in range(W):
+        for row, stone in enumerate(grid[col]):
+            mask |= bit(col, row)
+            if stone == player:
+                current |= bit(col, row)
+    return current, mask
+
+def reference_winning_cells(grid, player: int) -> int:
+    "Empty cells (playable or not) where a stone of player would make four"
+    cells = 0
+    for col in range(W):
+        for row in range(len(grid[col]), H):
+            for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                for start in range(-3, 1): # The cell is the (-start)th of the line
+                    line = [(col + (start + k) * dc, row + (start + k) * dr) for k in range(4)]
+                    if all((c, r) == (col, row) or grid_cell(grid, c, r) == player for c, r in line):
+                        cells |= bit(col, row)
+    return cells
+
+def reference_non_losing(grid, opponent_cells: int) -> int:
+    "Moves that leave the opponent no playable winning cell (our stone can only take one of their cells away)"
+    result = 0
+    for col in range(W):
+        row = len(grid[col])
+        if row == H:
+            continue
+        cells = opponent_cells & ~bit(col, row)
+        playable = [bit(c, len(grid[c]) + (c == col)) for c in range(W) if len(grid[c]) + (c == col) < H]
+        if not any(cells & cell for cell in playable):
+            result |= bit(col, row)
+    return result
+
+def reference_node(grid) -> dict:
+    "Expected values of the primitives at one node"
+    nb_moves = sum(len(column) for column in grid)
+    player = nb_moves & 1
+    possible = sum(bit(col, len(grid[col])) for col in range(W) if len(grid[col]) < H)
+    winning = reference_winning_cells(grid, player)
+    expected = {
+        'position/mask': reference_masks(grid, nb_moves),
+        'possible': possible,
+        'has_won(player to move)': reference_has_won(grid, player),
+        'has_won(opponent)': reference_has_won(grid, player ^ 1),
+        'winning_position': winning,
+    }
+    if not winning & possible: # possible_non_losing_moves assumes no immediate win
+        expected['possible_non_losing_moves'] = reference_non_losing(grid, reference_winning_cells(grid, player ^ 1))
+    return expected
+
+def board_values(board, expected: dict) -> dict:
+    "The same values computed by the board under test"
+    values = {
+        'position/mask': (int(board.current_position), int(board.mask)),
+        'possible': int(board.possible()),
+        'has_won(player to move)': bool(board.has_won(board.current_position)),
+        'has_won(opponent)': bool(board.has_won(board.current_position ^ board.mask)),
+        'winning_position': int(board.winning_position()),
+    }
+    if 'possible_non_losing_moves' in expected:
+        values['possible_non_losing_moves'] = int(board.possible_non_losing_moves())
+    return values
+
+def validate(boards: dict, grid, depth: int, errors: List[str], path: str = "", max_errors: int = 20):
+    "Walk the tree like perft and check every backend at every node against the reference, computed once per node"
+    if len(errors) >= max_errors:
+        return
+    expected = reference_node(grid)
+    for name, board in boards.items():
+        got = board_values(board, expected)
+        for what, value in expected.items():
+            if got[what] != value:
+                errors.append(f"{name} {path or '(root)'}: {what} {got[what]} != {value}")
+    nb_moves = sum(len(column) for column in grid)
+    if depth == 0 or nb_moves >= SIZE:
+        return
+    for col in range(W):
+        if len(grid[col]) == H:
+            continue
+        grid[col].append(nb_moves & 1)
+        moves = {}
+        for name, board in boards.items():
+            moves[name] = (board.mask + board.bottom_mask_col(col)) & board.column_mask(col)
+            board.play(moves[name])
+        if reference_has_won(grid, nb_moves & 1): # Game over: only the win itself is checked
+            for name, board in boards.items():
+                if not board.has_won(board.current_position ^ board.mask):
+                    errors.append(f"{name} {path + str(col + 1)}: has_won(player who moved) False != True")
+        else:
+            validate(boards, grid, depth - 1, errors, path + str(col + 1), max_errors)
+        grid[col].pop()
+        for name, board in boards.items():
+            board.unplay(moves[name])
+            if (int(board.current_position), int(board.mask)) != reference_masks(grid, nb_moves):
+                errors.append(f"{name} {path + str(col + 1)}: unplay did not restore the position")
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft counts, reference validation and moves/sec of the board backends")
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--positions', nargs='*', default=PERFT_POSITIONS, help="1-based move sequences")
+    parser.add_argument('--backends', nargs='*', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--validate', action='store_true', help="check every node against the slow reference")
+    args = parser.parse_args()
+
+    failed = False
+    for seq in args.positions:
+        grid = grid_from_sequence(seq)
+        reference = reference_perft(grid, args.depth, len(seq))
+        print(f"'{seq}' depth {args.depth}: {reference.leaves} leaves, {reference.wins} wins, {reference.draws} draws (reference)")
+        for name in args.backends:
+            board = make_board(BACKENDS[name], seq)
+            start = time.perf_counter()
+            counts = perft(board, args.depth)
+            seconds = time.perf_counter() - start
+            status = "ok" if counts == reference else f"MISMATCH {counts}"
+            failed |= counts != reference
+            print(f"  {name:>6}: {counts.moves / seconds:>12,.0f} moves/sec ({counts.moves} moves, {seconds:.2f}s) {status}")
+        if args.validate:
+            errors = []
+            validate({name: make_board(BACKENDS[name], seq) for name in args.backends}, grid, args.depth, errors)
+            failed |= bool(errors)
+            for error in errors:
+                print(f"    {error}")
+            print(f"  primitives of {', '.join(args.backends)} {'ok' if not errors else 'FAILED'} against the reference")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Benchmark suite over a checked-in set of graded positions, with a baseline to catch regressions.
+
+  python bench_suite.py generate            # (re)build bench_positions.json, slow: every position is solved exactly
+  python bench_suite.py run                 # run and compare with bench_baseline.json, exit 1 on regression
+  python bench_suite.py run --save-baseline # run and make this run the new baseline
+
+Every position has exact reference answers (its score and all columns reaching it), so best-move
+agreement is measured against perfect play. Phases are by ply, difficulty by the node count of the
+exact solve. Node counts at fixed depth are deterministic; timings depend on the machine, so the
+baseline should be saved on the machine that runs the comparison.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+from bench_common import make_board, new_solver
+from board import Board
+from eval_board import EvalBoard
+from int_board import IntBoard
+from solver import Solver
+
+BACKENDS = {'numpy': Board, 'int': IntBoard, 'eval': EvalBoard}
+POSITIONS_FILE = "bench_positions.json"
+BASELINE_FILE = "bench_baseline.json"
+
+# phase -> (min plies, max plies); opening positions start at ply 10 so they stay exactly solvable
+PHASES = {'opening': (10, 13), 'middle': (14, 19), 'endgame': (20, 28)}
+# difficulty -> node count of the exact solve below which a position belongs to it
+DIFFICULTIES = {'easy': 20000, 'medium': 300000, 'hard': None}
+
+# metric -> (worse direction, default threshold); thresholds are relative except for the depth
+THRESHOLDS = {
+    'nodes': ('up', 0.05),
+    'nps': ('down', 0.15),
+    'time_to_depth': ('up', 0.20),
+    'tt_hit_rate': ('down', 0.05),
+    'agreement_depth': ('down', 0.0),
+    'agreement_time': ('down', 0.0),
+    'depth_at_time': ('down', 0.5),
+}
+
+def difficulty_of(nodes: int) -> str:
+    "Difficulty bucket of an exact solve's node count"
+    for name, limit in DIFFICULTIES.items():
+        if limit is None or nodes < limit:
+            return name
+
+def exact_solver(time_limit: float) -> Solver:
+    "Solver that goes straight to the exact solver and gives it the whole time limit"
+    return new_solver(IntBoard, {'exact_from_ply': 0, 'exact_time_fraction': 1.0}, tt_size_bytes=64 * 1024 * 1024)
+
+def reference_answers(board, solver: Solver, time_limit: float, node_limit: Optional[int] = None) -> Optional[dict]:
+    "Exact score and every optimal column (0-based), None if a solve does not finish in time or goes over node_limit"
+    score, _ = solver.solve(board, 1, time_limit=time_limit)
+    nodes = solver.node_count
+    if not solver.last_solve_exact or (node_limit is not None and nodes >= node_limit):
+        return None
+    best_cols = []
+    non_losing = board.possible_non_losing_moves()
+    for col in range(Board.WIDTH):
+        if not non_losing & IntBoard.column_mask(col):
+            continue
+        child = board.copy()
+        child.play_col(col)
+        child_score, _ = solver.solve(child, 1, time_limit=time_limit)
+        if not solver.last_solve_exact:
+            return None
+        nodes += solver.node_count
+        if node_limit is not None and nodes >= node_limit:
+            return None
+        if -child_score == score:
+            best_cols.append(col)
+    return {'score': int(score), 'best_cols': best_cols, 'exact_nodes': nodes}
+
+def random_position(rng: random.Random, plies: int) -> Optional[str]:
+    "Random game of non-losing moves, None if it ends before plies or the final position has no real choice"
+    board = IntBoard()
+    seq = ""
+    while board.nb_moves() < plies:
+        non_losing = board.possible_non_losing_moves()
+        if not non_losing:
+            return None
+        col = rng.choice([c for c in range(Board.WIDTH) if non_losing & IntBoard.column_mask(c)])
+        board.play_col(col)
+        seq += str(col + 1)
+    if board.winning_position() & board.possible(): # Trivial for every solver
+        return None
+    non_losing = board.possible_non_losing_moves()
+    if not non_losing & (non_losing - 1): # Lost or forced: every solver agrees
+        return None
+    return seq
+
+def generate(path: str, per_bucket: int, seed: int, solve_time: float, max_attempts: int):
+    "Fill every (phase, difficulty) bucket with up to per_bucket exactly solved random positions"
+    rng = random.Random(seed)
+    solver = exact_solver(solve_time)
+    positions = []
+    seen = set()
+    for phase, (lo, hi) in PHASES.items():
+        counts = dict.fromkeys(DIFFICULTIES, 0)
+        for _ in range(max_attempts):
+            if min(counts.values()) >= per_bucket:
+                break
+            seq = random_position(rng, rng.randint(lo, hi))
+            if seq is None or seq in seen:
+                continue
+            seen.add(seq)
+            solver.trans_table.clear()
+            solver.exact_table.clear()
+            node_limit = None
+            if counts['hard'] >= per_bucket: # Stop solving as soon as a position turns out hard
+                node_limit = DIFFICULTIES['medium']
+            answers = reference_answers(make_board(IntBoard, seq), solver, solve_time, node_limit)
+            if answers is None:
+                continue
+            difficulty = difficulty_of(answers['exact_nodes'])
+            if counts[difficulty] >= per_bucket:
+                continue
+            counts[difficulty] += 1
+            positions.append({'id': f"{phase}-{difficulty}-{counts[difficulty]}", 'moves': seq,
+                              'phase': phase, 'difficulty': difficulty, **answers})
+            print(f"{positions[-1]['id']}: {seq} score {answers['score']} best {answers['best_cols']}", flush=True)
+        print(f"{phase}: {counts}")
+
+    with open(path, 'w') as f:
+        json.dump({'seed': seed, 'positions': positions}, f, indent=1)
+        f.write("\n")
+
+def run_position(position: dict, board_class, depth: int, time_limit: float) -> dict:
+    "Fixed-depth then fixed-time solve of one position, each with a fresh Solver"
+    board = make_board(board_class, position['moves'])
+
+    solver = new_solver(board_class)
+    start = time.perf_counter()
+    _, move = solver.solve(board, depth)
+    elapsed = time.perf_counter() - start
+    stats = solver.last_stats
+    record = {
+        'nodes': solver.node_count,
+        'time': elapsed,
+        'exact': solver.last_solve_exact,
+        'time_to_depth': [round(iteration.total_time, 6) for iteration in stats.iterations],
+        'tt_hits': solver.cache_hits,
+        'tt_misses': solver.cache_misses,
+        'agree_depth': solver.get_col_from_move(move) in position['best_cols'],
+    }
+
+    solver = new_solver(board_class)
+    _, move = solver.solve(board, Board.WIDTH * Board.HEIGHT, time_limit=time_limit)
+    # An exact solve sees to the end of the game
+    record['depth_at_time'] = (Board.WIDTH * Board.HEIGHT - board.nb_moves() if solver.last_solve_exact
+                               else solver.last_completed_depth)
+    record['agree_time'] = solver.get_col_from_move(move) in position['best_cols']
+    return record
+
+def summarize(positions: List[dict], results: Dict[str, dict], depth: int) -> dict:
+    "Metrics of a group of positions"
+    records = [results[p['id']] for p in positions]
+    nodes = sum(r['nodes'] for r in records)
+    seconds = sum(r['time'] for r in records)
+    probes = sum(r['tt_hits'] + r['tt_misses'] for r in records)
+    searched = [r for r in records if len(r['time_to_depth']) == depth] # Exact and early-stopped solves have no time to depth
+    return {
+        'positions': len(records),
+        'nodes': nodes,
+        'time': round(seconds, 4),
+        'nps': round(nodes / seconds, 1) if seconds > 0 else 0.0,
+        'time_to_depth': round(sum(r['time_to_depth'][-1] for r in searched), 4),
+        'tt_hit_rate': round(sum(r['tt_hits'] for r in records) / probes, 4) if probes else 0.0,
+        'agreement_depth': round(sum(r['agree_depth'] for r in records) / len(records), 4),
+        'agreement_time': round(sum(r['agree_time'] for r in records) / len(records), 4),
+        'depth_at_time': round(sum(r['depth_at_time'] for r in records) / len(records), 2),
+    }
+
+def run_suite(positions: List[dict], backend: str, depth: int, time_limit: float) -> dict:
+    "Run every position, return the report: settings, per-bucket summaries and per-position records"
+    board_class = BACKENDS[backend]
+    results = {}
+    for position in positions:
+        results[position['id']] = run_position(position, board_class, depth, time_limit)
+        r = results[position['id']]
+        print(f"{position['id']:>18}: {r['nodes']:>8} nodes {r['time']:6.2f}s  depth@{time_limit}s {r['depth_at_time']:>2}"
+              f"  agree {'y' if r['agree_depth'] else 'n'}/{'y' if r['agree_time'] else 'n'}", flush=True)
+
+    groups = {'all': positions}
+    for phase in PHASES:
+        groups[phase] = [p for p in positions if p['phase'] == phase]
+    for difficulty in DIFFICULTIES:
+        groups[difficulty] = [p for p in positions if p['difficulty'] == difficulty]
+    summary = {name: summarize(group, results, depth) for name, group in groups.items() if group}
+    return {'settings': {'backend': backend, 'depth': depth, 'time': time_limit},
+            'summary': summary, 'positions': results}
+
+def compare(report: dict, baseline: dict, thresholds: Dict[str, float]) -> List[str]:
+    "Regressions of report against baseline, as messages"
+    if report['settings'] != baseline['settings']:
+        return [f"settings differ from the baseline: {report['settings']} != {baseline['settings']}"]
+    regressions = []
+    for group, metrics in report['summary'].items():
+        old_metrics = baseline['summary'].get(group)
+        if old_metrics is None:
+            continue
+        for metric, (worse, _) in THRESHOLDS.items():
+            old, new = old_metrics[metric], metrics[metric]
+            limit = thresholds[metric]
+            if metric == 'depth_at_time':
+                change = new - old
+            elif old:
+                change = (new - old) / old
+            else:
+                continue
+            if (worse == 'up' and change > limit) or (worse == 'down' and -change > limit):
+                regressions.append(f"{group}.{metric}: {old} -> {new}")
+    return regressions
+
+def print_summary(report: dict, baseline: Optional[dict]):
+    "One line per bucket, with the baseline value next to each metric"
+    for group, metrics in report['summary'].items():
+        old_metrics = (baseline or {}).get('summary', {}).get(group, {})
+        cells = []
+        for metric in ('nodes', 'nps', 'time_to_depth', 'tt_hit_rate', 'agreement_depth', 'agreement_time', 'depth_at_time'):
+            old = old_metrics.get(metric)
+            cells.append(f"{metric} {metrics[metric]}" + (f" (was {old})" if old is not None else ""))
+        print(f"{group:>8} [{metrics['positions']}]: " + ", ".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description="Graded benchmark positions with baseline comparison")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help="build the positions file")
+    gen.add_argument('--positions', default=POSITIONS_FILE)
+    gen.add_argument('--per-bucket', type=int, default=3, help="positions per (phase, difficulty)")
+    gen.add_argument('--seed', type=int, default=2024)
+    gen.add_argument('--solve-time', type=float, default=30.0, help="seconds allowed per exact solve")
+    gen.add_argument('--max-attempts', type=int, default=200, help="random positions tried per phase")
+
+    run = commands.add_parser('run', help="run the suite and compare with the baseline")
+    run.add_argument('--positions', default=POSITIONS_FILE)
+    run.add_argument('--baseline', default=BASELINE_FILE)
+    run.add_argument('--save-baseline', action='store_true', help="write this run as the baseline")
+    run.add_argument('--backend', choices=BACKENDS, default='eval')
+    run.add_argument('--depth', type=int, default=8, help="fixed depth of the node / time-to-depth runs")
+    run.add_argument('--time', type=float, default=1.0, help="seconds of the fixed-time runs")
+    run.add_argument('--phase', choices=PHASES, default=None, help="only run one phase")
+    for metric, (worse, default) in THRESHOLDS.items():
+        run.add_argument(f"--max-{metric.replace('_', '-')}", type=float, default=default, dest=metric,
+                         help=f"allowed {'increase' if worse == 'up' else 'drop'} (default {default})")
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate(args.positions, args.per_bucket, args.seed, args.solve_time, args.max_attempts)
+        return
+
+    with open(args.positions) as f:
+        positions = json.load(f)['positions']
+    if args.phase is not None:
+        positions = [p for p in positions if p['phase'] == args.phase]
+    report = run_suite(positions, args.backend, args.depth, args.time)
+    report['settings']['phase'] = args.phase # A one-phase run is only comparable with a one-phase baseline
+
+    if args.save_baseline:
+        print_summary(report, None)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=1)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = None
+    print_summary(report, baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return
+    regressions = compare(report, baseline, {metric: getattr(args, metric) for metric in THRESHOLDS})
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+    print("No regression against the baseline")
+
+if __name__ == "__main__":
+    main()
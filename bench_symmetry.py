@@ -0,0 +1,18 @@
+import argparse
+from bench_common import solve_positions
+from int_board import IntBoard
+
+def main():
+    parser = argparse.ArgumentParser(description="Trans table hit rate with and without mirror canonical keys")
+    parser.add_argument('--depth', type=int, default=8)
+    args = parser.parse_args()
+
+    for use_symmetry in (False, True):
+        run = solve_positions(IntBoard, args.depth, {'use_symmetry': use_symmetry}, counters=('cache_hits', 'cache_misses'))
+        hits, misses = run.counters['cache_hits'], run.counters['cache_misses']
+        rate = hits / (hits + misses) if hits + misses else 0.0
+        label = "mirror" if use_symmetry else "plain"
+        print(f"{label:>6}: {run.nodes} nodes, TT hit rate {rate:.1%} ({hits} hits / {misses} misses), {run.seconds:.2f}s")
+
+if __name__ == "__main__":
+    main()
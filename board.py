@@ -39,14 +39,26 @@ class Board:
         self.mask |= move # Make a move
         self.moved_step += 1 # Increase step
 
-    # def play_sequence(self, seq):
-    #     "Play using a sequence of input numbers"
-    #     for i in range(len(seq)):
-    #         column = ord(seq[i]) - ord('1')
-    #         if column < 0 or column >= Board.WIDTH or not self.can_play(column) or self.is_winning_move(column):
-    #             return i  # used to compare to the len of seq -> fail
-    #         self.play_col(column)
-    #     return len(seq) # success
+    def unplay(self, move):
+        "Undo play(move), move must be the last move played"
+        self.mask ^= move # Remove the stone
+        self.current_position ^= self.mask # Switch player back
+        self.moved_step -= 1
+
+    def play_sequence(self, seq):
+        "Play using a sequence of input numbers (1-based columns, e.g. '4453')"
+        for i in range(len(seq)):
+            column = ord(seq[i]) - ord('1')
+            if column < 0 or column >= self.WIDTH or not self.can_play(column) or self.is_winning_move(column):
+                return i  # used to compare to the len of seq -> fail
+            self.play_col(column)
+        return len(seq) # success
+
+    def set_position(self, current_position, mask):
+        "Load a position from its bitboards (current player's stones, all stones)"
+        self.current_position = type(self.current_position)(current_position)
+        self.mask = type(self.mask)(mask)
+        self.moved_step = self.pop_count(mask)
 
     def can_win_next(self):
         "Check if the current player can win on the next move"
@@ -154,6 +166,27 @@ class Board:
         "Return a bit-mask that has bit 1 at all position of the column"
         return np.int64((1 << Board.HEIGHT) - 1) << (column * (Board.HEIGHT + 1))
 
+    @staticmethod
+    def mirror(bitboard):
+        "Mirror a bit-mask (position, mask, key or move) around the center column"
+        bitboard = int(bitboard)
+        result = 0
+        H1 = Board.HEIGHT + 1
+        for col in range(Board.WIDTH):
+            column_bits = (bitboard >> (col * H1)) & ((1 << H1) - 1) # Column incl. its spare top bit
+            result |= column_bits << ((Board.WIDTH - 1 - col) * H1)
+        return result
+
+    @staticmethod
+    def column_from_move(move):
+        "Return the column of a single-bit move mask, or -1"
+        if not move:
+            return -1
+        for col in range(Board.WIDTH):
+            if move & Board.column_mask(col):
+                return col
+        return -1
+
     def print_board(self):
         "print board"
         player_1_pos = np.int64(0)
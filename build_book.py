@@ -0,0 +1,55 @@
+import argparse
+import time
+from int_board import IntBoard
+from opening_book import canonical_key, write_book
+from solver import Solver
+
+def enumerate_positions(board_class, max_plies):
+    "Yield every reachable, unfinished position up to max_plies, once per mirror pair"
+    seen = set()
+    stack = [board_class()]
+    while stack:
+        board = stack.pop()
+        key, _ = canonical_key(board.key())
+        if key in seen:
+            continue
+        seen.add(key)
+        yield board
+        if board.nb_moves() >= max_plies:
+            continue
+        for col in range(board_class.WIDTH):
+            if board.can_play(col):
+                child = board.copy()
+                child.play_col(col)
+                if not child.has_won(child.current_position ^ child.mask): # Finished games are not book positions
+                    stack.append(child)
+
+def build_book(path, max_plies, depth, time_limit=None, tt_size_bytes=64 * 1024 * 1024):
+    "Solve every position up to max_plies and write the book"
+    solver = Solver(IntBoard, tt_size_bytes=tt_size_bytes)
+    solver.verbose = False
+    entries = []
+    start = time.time()
+    for board in enumerate_positions(IntBoard, max_plies):
+        score, move = solver.solve(board, depth, time_limit=time_limit)
+        column = solver.get_col_from_move(move)
+        if column == -1:
+            continue
+        key, mirrored = canonical_key(board.key())
+        entries.append((key, int(score), IntBoard.WIDTH - 1 - column if mirrored else column))
+        if len(entries) % 1000 == 0:
+            print(f" {len(entries)} positions solved ({time.time() - start:.0f}s)")
+    write_book(path, max_plies, entries)
+    print(f"Wrote {len(entries)} positions to {path} in {time.time() - start:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book by solving all positions up to N plies")
+    parser.add_argument('path')
+    parser.add_argument('--plies', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=12)
+    parser.add_argument('--time-limit', type=float, default=None, help="per position, seconds")
+    args = parser.parse_args()
+    build_book(args.path, args.plies, args.depth, args.time_limit)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from board import Board
+from int_board import IntBoard
+
+W = Board.WIDTH
+H = Board.HEIGHT
+H1 = H + 1
+
+def _build_windows():
+    "All 69 lines of four cells, as tuples of bit indexes in increasing order"
+    windows = []
+    for col in range(W):
+        for row in range(H):
+            for dc, dr in ((0, 1), (1, 0), (1, 1), (1, -1)): # vertical, horizontal, diagonal /, diagonal \
+                cells = [(col + k * dc, row + k * dr) for k in range(4)]
+                if all(0 <= c < W and 0 <= r < H for c, r in cells):
+                    windows.append(tuple(sorted(r + c * H1 for c, r in cells)))
+    return tuple(windows)
+
+WINDOWS = _build_windows()
+# For each bit index: the (window, bit of the cell inside the window's 4-bit state) pairs through it
+CELL_WINDOWS = tuple(tuple((w, 1 << window.index(bit)) for w, window in enumerate(WINDOWS) if bit in window)
+                     for bit in range(W * H1))
+WINDOW_ANCHOR = tuple(window[0] for window in WINDOWS) # lowest cell, where Solver.heuristic counts 2-2 patterns
+PATTERN_22 = frozenset((0b0011, 0b1100, 0b0101, 0b1010)) # XX.. ..XX X.X. .X.X (low bit first)
+# 3-in-a-window states -> bit index (0..3) of the empty cell
+MISSING_CELL = {0b1110: 0, 0b1101: 1, 0b1011: 2, 0b0111: 3}
+CENTER_MASK = IntBoard.COLUMN_MASKS[W // 2]
+
+class EvalBoard(IntBoard):
+    "IntBoard that keeps the heuristic's pattern counts up to date on every play/unplay"
+
+    def __init__(self):
+        "Constructor: empty board and empty pattern counts"
+        super().__init__()
+        self._reset_eval()
+
+    def _reset_eval(self):
+        "Per player (0 moves first): window states, per-cell counters and their non-zero counts"
+        self.window_bits = [[0] * len(WINDOWS), [0] * len(WINDOWS)]
+        self.threats = [[0] * (W * H1), [0] * (W * H1)]  # lines with 3 own stones and the cell empty
+        self.anchors = [[0] * (W * H1), [0] * (W * H1)]  # 2-2 patterns anchored at the cell
+        self.threat_cells = [0, 0]
+        self.anchor_cells = [0, 0]
+        self.center = [0, 0]
+
+    def copy(self):
+        "Create a copy of the current board"
+        new_board = EvalBoard.__new__(EvalBoard)
+        new_board.current_position = self.current_position
+        new_board.mask = self.mask
+        new_board.moved_step = self.moved_step
+        new_board.window_bits = [self.window_bits[0][:], self.window_bits[1][:]]
+        new_board.threats = [self.threats[0][:], self.threats[1][:]]
+        new_board.anchors = [self.anchors[0][:], self.anchors[1][:]]
+        new_board.threat_cells = self.threat_cells[:]
+        new_board.anchor_cells = self.anchor_cells[:]
+        new_board.center = self.center[:]
+        return new_board
+
+    def play(self, move):
+        "Play a move by a bit-mask move"
+        self._update(move, self.moved_step & 1, True)
+        self.current_position ^= self.mask
+        self.mask |= move
+        self.moved_step += 1
+
+    def unplay(self, move):
+        "Undo play(move), move must be the last move played"
+        self.mask ^= move
+        self.current_position ^= self.mask
+        self.moved_step -= 1
+        self._update(move, self.moved_step & 1, False)
+
+    def set_position(self, current_position, mask):
+        "Load a position from its bitboards and rebuild the pattern counts"
+        super().set_position(current_position, mask)
+        self._reset_eval()
+        first_player = self.current_position if self.moved_step % 2 == 0 else self.current_position ^ self.mask
+        for bit in range(W * H1):
+            move = 1 << bit
+            if self.mask & move:
+                self._update(move, 0 if first_player & move else 1, True)
+
+    def _count(self, player, bits, w, sign):
+        "Add (sign=1) or remove (sign=-1) the patterns of one window state of player"
+        if bits in PATTERN_22:
+            anchors = self.anchors[player]
+            cell = WINDOW_ANCHOR[w]
+            if sign > 0:
+                if anchors[cell] == 0: self.anchor_cells[player] += 1
+                anchors[cell] += 1
+            else:
+                anchors[cell] -= 1
+                if anchors[cell] == 0: self.anchor_cells[player] -= 1
+        elif bits in MISSING_CELL:
+            threats = self.threats[player]
+            cell = WINDOWS[w][MISSING_CELL[bits]]
+            if sign > 0:
+                if threats[cell] == 0: self.threat_cells[player] += 1
+                threats[cell] += 1
+            else:
+                threats[cell] -= 1
+                if threats[cell] == 0: self.threat_cells[player] -= 1
+
+    def _update(self, move, player, add):
+        "Apply the stone of player at move to every window through its cell"
+        cell = int(move).bit_length() - 1
+        other = player ^ 1
+        own_bits = self.window_bits[player]
+        other_bits = self.window_bits[other]
+        count = self._count
+        if move & CENTER_MASK:
+            self.center[player] += 1 if add else -1
+
+        for w, bit in CELL_WINDOWS[cell]:
+            before = own_bits[w]
+            after = before | bit if add else before & ~bit
+            own_bits[w] = after
+            theirs = other_bits[w]
+            if theirs == 0: # Only own stones in the window: own patterns change
+                count(player, before, w, -1)
+                count(player, after, w, 1)
+            elif before == 0: # First own stone kills the other player's patterns in this window
+                count(other, theirs, w, -1)
+            elif after == 0: # Last own stone removed: the other player's patterns come back
+                count(other, theirs, w, 1)
+
+    def evaluate(self, weights):
+        "Same value as Solver.heuristic for the player to move"
+        "weights: (center, own threats, opponent threats, own 2-2, opponent 2-2)"
+        me = self.moved_step & 1
+        other = me ^ 1
+        center_w, threat_w, opp_threat_w, p22_w, opp_p22_w = weights
+        return (self.center[me] * center_w + self.threat_cells[me] * threat_w - self.threat_cells[other] * opp_threat_w
+                + self.anchor_cells[me] * p22_w - self.anchor_cells[other] * opp_p22_w)
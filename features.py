@@ -0,0 +1,85 @@
+import json
+import os
+import numpy as np
+from typing import Sequence, Tuple
+from board import Board
+from int_board import IntBoard
+
+W = Board.WIDTH
+H = Board.HEIGHT
+H1 = H + 1
+
+# The terms of Solver.heuristic, in the order of Solver.heuristic_weights
+FEATURE_NAMES = ('center', 'own_threats', 'opponent_threats', 'own_22', 'opponent_22')
+FEATURE_SIGNS = np.array([1, 1, -1, 1, -1], dtype=np.int64) # heuristic = sum(sign * weight * feature)
+DEFAULT_WEIGHTS = (3, 5, 6, 2, 3)
+WEIGHTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "heuristic_weights.json")
+
+BOARD_MASK = np.uint64(IntBoard.board_mask)
+CENTER_MASK = np.uint64(IntBoard.COLUMN_MASKS[W // 2])
+
+def load_weights(path: str = WEIGHTS_FILE) -> Tuple[int, ...]:
+    "Heuristic weights from a JSON config written by save_weights (DEFAULT_WEIGHTS if the file does not exist)"
+    if not os.path.exists(path):
+        return DEFAULT_WEIGHTS
+    with open(path) as f:
+        config = json.load(f)
+    return tuple(int(config[name]) for name in FEATURE_NAMES)
+
+def save_weights(weights: Sequence[int], path: str = WEIGHTS_FILE):
+    "Write heuristic weights as a JSON config"
+    with open(path, 'w') as f:
+        json.dump(dict(zip(FEATURE_NAMES, (int(w) for w in weights))), f, indent=1)
+        f.write("\n")
+
+def popcount(a: np.ndarray) -> np.ndarray:
+    "Number of set bits of every uint64"
+    if hasattr(np, 'bitwise_count'): # NumPy >= 2.0
+        return np.bitwise_count(a).astype(np.int64)
+    return np.unpackbits(a.view(np.uint8)).reshape(-1, 64).sum(axis=1, dtype=np.int64)
+
+def winning_cells(board: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    "Board.compute_winning_position on arrays"
+    r = (board << 1) & (board << 2) & (board << 3) # vertical
+    for s in (H1, H, H + 2): # horizontal, both diagonals
+        p = (board << s) & (board << 2 * s)
+        r |= p & (board << 3 * s)
+        r |= p & (board >> s)
+        p = (board >> s) & (board >> 2 * s)
+        r |= p & (board << s)
+        r |= p & (board >> 3 * s)
+    return r & (BOARD_MASK ^ mask)
+
+def patterns_22(player: np.ndarray, empty: np.ndarray) -> np.ndarray:
+    "Cells starting a XX.. ..XX X.X. .X.X line of player, in any direction (as in Solver.heuristic)"
+    result = np.zeros_like(player)
+    for s in (1, H, H1, H + 2):
+        p_s = (player >> s) & BOARD_MASK
+        p_2s = (player >> 2 * s) & BOARD_MASK
+        p_3s = (player >> 3 * s) & BOARD_MASK
+        e_s = empty >> s
+        e_2s = empty >> 2 * s
+        e_3s = empty >> 3 * s
+        result |= player & p_s & e_2s & e_3s
+        result |= empty & e_s & p_2s & p_3s
+        result |= player & e_s & p_2s & e_3s
+        result |= empty & p_s & e_2s & p_3s
+    return result
+
+def batch_features(positions, masks) -> np.ndarray:
+    "Feature matrix (N, 5) of FEATURE_NAMES for the player to move; positions are Board.current_position values"
+    player = np.asarray(positions, dtype=np.uint64) & BOARD_MASK
+    mask = np.asarray(masks, dtype=np.uint64)
+    opponent = (player ^ mask) & BOARD_MASK
+    empty = ~mask & BOARD_MASK
+    return np.stack([
+        popcount(player & CENTER_MASK),
+        popcount(winning_cells(player, mask)),
+        popcount(winning_cells(opponent, mask)),
+        popcount(patterns_22(player, empty)),
+        popcount(patterns_22(opponent, empty)),
+    ], axis=1)
+
+def batch_heuristic(positions, masks, weights: Sequence[int] = DEFAULT_WEIGHTS) -> np.ndarray:
+    "Solver.heuristic for every (position, mask) pair"
+    return batch_features(positions, masks) @ (FEATURE_SIGNS * np.asarray(weights, dtype=np.int64))
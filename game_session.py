@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+from board import Board
+from solver import Solver
+
+class PonderRecord(NamedTuple):
+    predicted: int       # column the ponder search assumed
+    played: int          # column actually played
+    hit: bool            # predicted == played
+    ponder_time: float   # seconds searched before the move arrived
+    depth_at_move: int   # depth completed while pondering
+    final_depth: int     # depth completed when the real search returned
+
+class GameSession:
+    "Owns one Board and one Solver for a whole game, so the trans table and PV survive between turns"
+
+    def __init__(self, board_class: type[Board] = Board, tt_size_bytes: int = 64 * 1024 * 1024):
+        "Constructor: init the game board and the long-lived solver"
+        self.Board = board_class
+        self.board = board_class()
+        self.solver = Solver(board_class, tt_size_bytes=tt_size_bytes)
+        self.expected_pv: List[int] = [] # columns expected from the current position on
+        self.last_depth = 0 # deepest completed depth of the last search
+
+        # Pondering state
+        self.ponder_log: List[PonderRecord] = []
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_stop: Optional[threading.Event] = None
+        self._ponder_move: Optional[int] = None
+        self._ponder_start = 0.0
+        self._ponder_result: Optional[Tuple[int, int]] = None
+        self._ponder_hit: Optional[Tuple[float, int]] = None # (ponder_time, depth_at_move) after a ponder hit
+        self._verbose = self.solver.verbose
+
+    def _move_mask(self, column: int) -> int:
+        "Bit-mask of playing column in the current position"
+        return (self.board.mask + self.Board.bottom_mask_col(column)) & self.Board.column_mask(column)
+
+    def play(self, column: int):
+        "Advance the game by a move played by either side"
+        if self._ponder_thread is not None:
+            if column == self._ponder_move: # Ponder hit: the background search becomes the real search
+                self._ponder_hit = (time.time() - self._ponder_start, self.solver.last_completed_depth)
+            else:
+                self.ponder_log.append(PonderRecord(self._ponder_move, column, False, time.time() - self._ponder_start,
+                                                    self.solver.last_completed_depth, 0))
+                self.stop_pondering()
+
+        self.board.play_col(column)
+        if self.expected_pv and self.expected_pv[0] == column: # Game follows the expected line
+            self.expected_pv = self.expected_pv[1:]
+        else:
+            self.expected_pv = []
+
+    def predicted_move(self) -> Optional[int]:
+        "Column expected to be played next, or None"
+        return self.expected_pv[0] if self.expected_pv else None
+
+    def start_pondering(self, depth: int) -> bool:
+        "Search the position after the predicted reply on a background thread, return False if nothing to ponder"
+        reply = self.predicted_move()
+        if self._ponder_thread is not None or reply is None or not self.board.can_play(reply):
+            return False
+
+        ponder_board = self.board.copy()
+        ponder_board.play_col(reply)
+        pv_move = 0
+        if len(self.expected_pv) > 1 and ponder_board.can_play(self.expected_pv[1]):
+            col = self.expected_pv[1]
+            pv_move = (ponder_board.mask + self.Board.bottom_mask_col(col)) & self.Board.column_mask(col)
+
+        self._ponder_move = reply
+        self._ponder_stop = threading.Event()
+        self._ponder_result = None
+        self._ponder_hit = None
+        self._ponder_start = time.time()
+        self._verbose = self.solver.verbose
+        self.solver.verbose = False # Do not print over the opponent's prompt
+
+        def run():
+            self._ponder_result = self.solver.solve(ponder_board, depth, time_limit=None, pv_move=pv_move,
+                                                    stop_event=self._ponder_stop)
+
+        self._ponder_thread = threading.Thread(target=run, name="ponder", daemon=True)
+        self._ponder_thread.start()
+        return True
+
+    def stop_pondering(self):
+        "Cancel the background search; the trans table keeps everything stored so far"
+        if self._ponder_thread is None:
+            return
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        self._ponder_thread = None
+        self._ponder_hit = None
+        self.solver.verbose = self._verbose
+
+    def best_move(self, depth: int, time_limit: Optional[float] = None) -> Tuple[int, int]:
+        "Search the current position with the warm solver, return (score, column) without playing it"
+        if self._ponder_thread is not None and self._ponder_hit is not None:
+            return self._finish_ponder_hit(time_limit)
+        self.stop_pondering()
+
+        hint = self.predicted_move()
+        pv_move = self._move_mask(hint) if hint is not None and self.board.can_play(hint) else 0
+        score, move = self.solver.solve(self.board, depth, time_limit=time_limit, pv_move=pv_move)
+        return self._finish_search(score, move)
+
+    def _finish_ponder_hit(self, time_limit: Optional[float]) -> Tuple[int, int]:
+        "Give the running ponder search the real time budget and wait for its result"
+        self.solver.extend_time_limit(time_limit)
+        self._ponder_thread.join()
+        ponder_time, depth_at_move = self._ponder_hit
+        self._ponder_thread = None
+        self._ponder_hit = None
+        self.solver.verbose = self._verbose
+
+        score, move = self._ponder_result
+        self.ponder_log.append(PonderRecord(self._ponder_move, self._ponder_move, True, ponder_time,
+                                            depth_at_move, self.solver.last_completed_depth))
+        return self._finish_search(score, move)
+
+    def _finish_search(self, score: int, move: int) -> Tuple[int, int]:
+        "Record depth and expected PV after a search"
+        column = self.solver.get_col_from_move(move)
+        self.last_depth = self.solver.last_completed_depth
+        self.expected_pv = self.solver.get_pv(self.board)
+        if not self.expected_pv or self.expected_pv[0] != column:
+            self.expected_pv = [column] if column != -1 else []
+        return score, column
+
+    def ponder_summary(self) -> str:
+        "Human readable ponder statistics"
+        hits = [r for r in self.ponder_log if r.hit]
+        misses = len(self.ponder_log) - len(hits)
+        if not self.ponder_log:
+            return "Ponder: no ponder searches"
+        ponder_time = sum(r.ponder_time for r in self.ponder_log)
+        converted = sum(r.ponder_time for r in hits)
+        depth_gain = sum(r.final_depth for r in hits) / len(hits) if hits else 0.0
+        depth_at_move = sum(r.depth_at_move for r in hits) / len(hits) if hits else 0.0
+        return (f"Ponder: {len(hits)} hits / {misses} misses, {ponder_time:.1f}s pondered, "
+                f"{converted:.1f}s converted into real search "
+                f"(avg depth {depth_at_move:.1f} at the move -> {depth_gain:.1f} final)")
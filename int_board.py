@@ -0,0 +1,141 @@
+from board import Board
+
+W = Board.WIDTH
+H = Board.HEIGHT
+H1 = H + 1
+
+class IntBoard(Board):
+    "Board backend on native Python ints with precomputed mask tables (same API as Board)"
+
+    # Precomputed masks (plain ints, built once at import)
+    bottom_mask = sum(1 << (col * H1) for col in range(W))
+    board_mask = bottom_mask * ((1 << H) - 1)
+    COLUMN_MASKS = tuple(((1 << H) - 1) << (col * H1) for col in range(W))
+    TOP_MASKS = tuple(1 << ((H - 1) + col * H1) for col in range(W))
+    BOTTOM_MASKS = tuple(1 << (col * H1) for col in range(W))
+    MOVE_TO_COL = {1 << (row + col * H1): col for col in range(W) for row in range(H)}
+
+    def __init__(self):
+        "Constructor: init default values"
+        self.current_position = 0  # current player
+        self.mask = 0              # both player
+        self.moved_step = 0        # step moved
+
+    def copy(self):
+        "Create a copy of the current board"
+        new_board = IntBoard.__new__(IntBoard)
+        new_board.current_position = self.current_position
+        new_board.mask = self.mask
+        new_board.moved_step = self.moved_step
+        return new_board
+
+    def possible_non_losing_moves(self):
+        "Return a bit-mask that has bit 1 where do not lead to a loss on the next turn"
+        possible_mask = self.possible()
+        opponent_win = self.opponent_winning_position()
+        forced_moves = possible_mask & opponent_win
+        if forced_moves:
+            if forced_moves & (forced_moves - 1):
+                return 0  # Lose
+            possible_mask = forced_moves
+        return possible_mask & ~(opponent_win >> 1)
+
+    def can_play(self, column):
+        "Check if a column can played by checking the top position"
+        return (self.mask & IntBoard.TOP_MASKS[column]) == 0
+
+    def play_col(self, column):
+        "Play at the column"
+        self.play((self.mask + IntBoard.BOTTOM_MASKS[column]) & IntBoard.COLUMN_MASKS[column])
+
+    def is_winning_move(self, column):
+        "Check if player play at this column, this player win"
+        return bool(self.winning_position() & self.possible() & IntBoard.COLUMN_MASKS[column])
+
+    def winning_position(self):
+        "Return a bit-mask that has bit 1 at all position can lead to a winning of current player"
+        return IntBoard.compute_winning_position(self.current_position, self.mask)
+
+    def opponent_winning_position(self):
+        "Return a bit-mask that has bit 1 at all position can lead to a winning of opponent player"
+        return IntBoard.compute_winning_position(self.current_position ^ self.mask, self.mask)
+
+    def possible(self):
+        "Return a bit-mask that has bit 1 at valid moves of current player"
+        return (self.mask + IntBoard.bottom_mask) & IntBoard.board_mask
+
+    @staticmethod
+    def pop_count(m):
+        "Count the number of bit 1"
+        return int(m).bit_count()
+
+    @staticmethod
+    def compute_winning_position(board, mask):
+        "Calculate the winning position of current player by bitwise (shift amounts inlined)"
+        # vertical
+        r = (board << 1) & (board << 2) & (board << 3)
+
+        # horizontal (shift 7)
+        p = (board << 7) & (board << 14)
+        r |= p & (board << 21)
+        r |= p & (board >> 7)
+        p = (board >> 7) & (board >> 14)
+        r |= p & (board << 7)
+        r |= p & (board >> 21)
+
+        # left diagonal (shift 6)
+        p = (board << 6) & (board << 12)
+        r |= p & (board << 18)
+        r |= p & (board >> 6)
+        p = (board >> 6) & (board >> 12)
+        r |= p & (board << 6)
+        r |= p & (board >> 18)
+
+        # right diagonal (shift 8)
+        p = (board << 8) & (board << 16)
+        r |= p & (board << 24)
+        r |= p & (board >> 8)
+        p = (board >> 8) & (board >> 16)
+        r |= p & (board << 8)
+        r |= p & (board >> 24)
+
+        return r & (IntBoard.board_mask ^ mask)
+
+    @staticmethod
+    def top_mask_col(column):
+        "Return a bit-mask that has bit 1 at the top of the column"
+        return IntBoard.TOP_MASKS[column]
+
+    @staticmethod
+    def bottom_mask_col(column):
+        "Return a bit-mask that has bit 1 at the bottom of the column"
+        return IntBoard.BOTTOM_MASKS[column]
+
+    @staticmethod
+    def column_mask(column):
+        "Return a bit-mask that has bit 1 at all position of the column"
+        return IntBoard.COLUMN_MASKS[column]
+
+    @staticmethod
+    def mirror(bitboard):
+        "Mirror a bit-mask around the center column (7 columns of 7 bits)"
+        return (((bitboard & 0x7F) << 42) | ((bitboard & 0x3F80) << 28) | ((bitboard & 0x1FC000) << 14)
+                | (bitboard & 0xFE00000) | ((bitboard >> 14) & 0x1FC000) | ((bitboard >> 28) & 0x3F80)
+                | ((bitboard >> 42) & 0x7F))
+
+    @staticmethod
+    def column_from_move(move):
+        "Return the column of a single-bit move mask, or -1"
+        return IntBoard.MOVE_TO_COL.get(int(move), -1)
+
+    def has_won(self, player_position):
+        "Check if a player has won"
+        y = player_position & (player_position >> 1)
+        if y & (y >> 2): return True
+        y = player_position & (player_position >> 7)
+        if y & (y >> 14): return True
+        y = player_position & (player_position >> 6)
+        if y & (y >> 12): return True
+        y = player_position & (player_position >> 8)
+        if y & (y >> 16): return True
+        return False
@@ -0,0 +1,21 @@
+import argparse
+import time
+from trans_table import TranspositionTable, merge_tables
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge saved trans tables (deepest entry wins) into one file")
+    parser.add_argument('output')
+    parser.add_argument('inputs', nargs='+')
+    parser.add_argument('--size-mb', type=int, default=None, help="size of the merged table, MiB (default: largest input)")
+    args = parser.parse_args()
+
+    start = time.time()
+    tables = [TranspositionTable.load(path) for path in args.inputs]
+    for path, table in zip(args.inputs, tables):
+        print(f" {path}: {sum(1 for _ in table.entries())} entries, {table.size_bytes // (1024 * 1024)} MiB")
+    merged = merge_tables(tables, args.size_mb * 1024 * 1024 if args.size_mb else None)
+    merged.save(args.output)
+    print(f"Wrote {sum(1 for _ in merged.entries())} entries to {args.output} in {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import mmap
+import struct
+from typing import Iterable, Optional, Tuple
+from board import Board
+
+BOOK_MAGIC = b'C4BK'
+BOOK_VERSION = 1
+HEADER = struct.Struct('<4sHHQ')  # magic, version, max plies, record count
+RECORD = struct.Struct('<Qib')    # canonical key, score, best column (in canonical orientation)
+
+def canonical_key(key: int) -> Tuple[int, bool]:
+    "Return (smaller of key and its mirror, True if the mirror was taken)"
+    key = int(key)
+    mirrored = Board.mirror(key) # key columns never carry into each other, so this is the mirror's key
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+def write_book(path: str, max_plies: int, entries: Iterable[Tuple[int, int, int]]):
+    "Write (canonical key, score, column) entries as a sorted binary book"
+    records = sorted(entries)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, max_plies, len(records)))
+        for key, score, column in records:
+            f.write(RECORD.pack(key, score, column))
+
+class OpeningBook:
+    "Read-only opening book: memory-mapped sorted records, looked up by binary search"
+
+    def __init__(self, path: str):
+        "Constructor: map the file, only the header is parsed"
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_plies, self.size = HEADER.unpack_from(self._map, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {BOOK_VERSION} opening book")
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        "Unmap and close the file"
+        self._map.close()
+        self._file.close()
+
+    def _find(self, key: int) -> Optional[Tuple[int, int]]:
+        "Binary search a canonical key, return (score, column) or None"
+        lo, hi = 0, self.size
+        data = self._map
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            offset = HEADER.size + mid * RECORD.size
+            mid_key = struct.unpack_from('<Q', data, offset)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, score, column = RECORD.unpack_from(data, offset)
+                return score, column
+        return None
+
+    def lookup(self, board: Board) -> Optional[Tuple[int, int]]:
+        "Return (score, column) for the board, or None if it is not in the book"
+        if board.nb_moves() > self.max_plies:
+            return None
+        key, mirrored = canonical_key(board.key())
+        found = self._find(key)
+        if found is None:
+            return None
+        score, column = found
+        if mirrored:
+            column = Board.WIDTH - 1 - column
+        return score, column
@@ -0,0 +1,136 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from board import Board
+from solver import Solver, TimeLimitExceededError
+from trans_table import SharedTranspositionTable
+
+# One long-lived Solver per worker process, so its trans table stays warm between calls
+_worker_solver: Optional[Solver] = None
+
+def _init_worker(board_class: type[Board], tt_size_bytes: int, table: Optional[SharedTranspositionTable] = None):
+    "Process pool initializer: build the worker's Solver (on the shared table when there is one)"
+    global _worker_solver
+    _worker_solver = Solver(board_class, tt_size_bytes=tt_size_bytes if table is None else 1024 * 1024)
+    _worker_solver.verbose = False
+    if table is not None:
+        _worker_solver.trans_table = table
+
+def _search_child(child: Board, depth: int, alpha, beta, deadline: Optional[float]) -> Tuple[Optional[int], int]:
+    "Worker task: one fixed-depth negamax of a root child inside (alpha, beta), return (score or None on timeout, nodes)"
+    time_limit = None if deadline is None else max(0.0, deadline - time.monotonic()) # CLOCK_MONOTONIC is system-wide
+    _worker_solver._begin_search(time_limit, new_generation=False) # The generation is advanced once per solve()
+    try:
+        score = _worker_solver._negamax(child.copy(), alpha, beta, depth)
+    except TimeLimitExceededError:
+        score = None
+    return score, _worker_solver.node_count
+
+class ParallelSolver:
+    "Root-splitting parallel search: PVS at the root, the root moves after the first are searched by worker processes"
+
+    def __init__(self, board_class: type[Board], workers: Optional[int] = None, tt_size_bytes=16 * 1024 * 1024):
+        "Constructor: start the process pool (workers defaults to the number of CPUs)"
+        "Where fork exists, all workers probe and fill one SharedTranspositionTable, else each has its own table"
+        "(whose generation then never advances: child searches are parts of one search, not new ones)"
+        self.Board = board_class
+        self.workers = workers or os.cpu_count() or 1
+        self.solver = Solver(board_class, tt_size_bytes=1024 * 1024) # Root checks and move helpers only
+        self.solver.verbose = False
+        self.node_count = 0
+        self.last_completed_depth = 0
+        if 'fork' in multiprocessing.get_all_start_methods():
+            self.table = SharedTranspositionTable(tt_size_bytes)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'),
+                                             initializer=_init_worker, initargs=(board_class, tt_size_bytes, self.table))
+        else:
+            self.table = None
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(board_class, tt_size_bytes))
+
+    def close(self):
+        "Shut the worker processes down"
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _search(self, child: Board, depth: int, alpha, beta, deadline: Optional[float]):
+        "Submit one child search, return its future"
+        return self._pool.submit(_search_child, child, depth, alpha, beta, deadline)
+
+    def _result(self, future) -> Optional[int]:
+        "Child score of a finished search (None if it timed out), its nodes are counted"
+        score, nodes = future.result()
+        self.node_count += nodes
+        return score
+
+    def _search_root(self, children, depth: int, deadline: Optional[float]) -> Optional[Tuple[int, int]]:
+        "One PVS round at the root, return (score, move) or None if the deadline stopped it"
+        "The first child gets the full window, the others a null window against its score in parallel;"
+        "the ones that fail high are searched again with the window above the best score so far"
+        first_move, first_child = children[0]
+        child_score = self._result(self._search(first_child, depth - 1, -math.inf, math.inf, deadline))
+        if child_score is None:
+            return None
+        best_score, best_move = -child_score, first_move
+
+        tests = [(move, child, self._search(child, depth - 1, -best_score - 1, -best_score, deadline))
+                 for move, child in children[1:]]
+        fail_high = []
+        for move, child, future in tests:
+            child_score = self._result(future)
+            if child_score is None:
+                return None
+            if -child_score > best_score:
+                fail_high.append((move, child))
+        for move, child in fail_high: # Rare with good ordering: re-searched one by one, each against the best so far
+            child_score = self._result(self._search(child, depth - 1, -math.inf, -best_score, deadline))
+            if child_score is None:
+                return None
+            if -child_score > best_score:
+                best_score, best_move = -child_score, move
+        return best_score, best_move
+
+    def solve(self, board: Board, target_depth: int, time_limit: Optional[float] = None) -> Tuple[int, Optional[int]]:
+        "Same contract as Solver.solve: return (best_score, best_move)"
+        self.node_count = 0
+        self.last_completed_depth = 0
+
+        root_score, root_move = self.solver._check_root_immediate_terminal(board)
+        if root_move is not None or root_score is not None:
+            return root_score if root_score is not None else 0, root_move
+
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        if self.table is not None:
+            self.table.advance_generation() # One generation for every child search of this solve(), on every worker
+        possible = board.possible()
+        children = []
+        for col in self.solver.column_order: # Center columns are searched first
+            move = possible & self.Board.column_mask(col)
+            if move:
+                child = board.copy()
+                child.play(move)
+                children.append((move, child))
+
+        best_score, best_move = -math.inf, children[0][0]
+        "Iterative deepening at the root: one PVS round per depth, the best move of a round goes first in the next"
+        for current_depth in range(1, target_depth + 1):
+            result = self._search_root(children, current_depth, deadline)
+            if result is None: # Timed out: keep the last completed round
+                break
+            best_score, best_move = result
+            self.last_completed_depth = current_depth
+            children.sort(key=lambda item: item[0] != best_move) # Stable: the others keep their order
+            if abs(best_score) == self.solver.SCORE_WINNING_MOVE: # Proven result
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+        return best_score, best_move
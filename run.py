@@ -1,12 +1,20 @@
+import os
 import time
 from board import Board
 from solver import Solver
+from game_session import GameSession
+from time_manager import TimeManager
 
 ROWS = 6 
 COLS = 7
 SEARCH_DEPTH = 11
-CACHE_SIZE = 30_000_000
+TT_SIZE_BYTES = 256 * 1024 * 1024
 TIME_LIMIT = 8
+MATCH_TIME = None # total seconds for all AI moves (match clock); None: TIME_LIMIT per move
+MATCH_INCREMENT = 0.0
+BOOK_PATH = None # opening book built by build_book.py, e.g. 'book.bin'
+TT_PATH = None # trans table file loaded at start and saved after the game, e.g. 'table.tt' (see merge_tables.py)
+PONDER = True # search the predicted reply while the human thinks
 HUMAN_SYMBOL = 'X'
 AI_SYMBOL = 'O'
 
@@ -19,18 +27,12 @@ def _get_fallback_move(game_board: Board, solver: Solver) -> int:
             return col
     return -1
 
-def get_ai_move(solver: Solver, game_board: Board, depth: int) -> int:
-    solver.reset_counters() 
-
-    score, best_move_mask = solver.solve(game_board, depth, time_limit=TIME_LIMIT) # Bỏ time_limit nếu không dùng
-
-    best_col = -1
-    if best_move_mask is not None and best_move_mask != 0:
-        best_col = solver.get_col_from_move(best_move_mask)
+def get_ai_move(session: GameSession, depth: int, time_limit: float = TIME_LIMIT) -> int:
+    score, best_col = session.best_move(depth, time_limit=time_limit) # Bỏ time_limit nếu không dùng
 
     "if solver failed"
     if best_col == -1:
-        best_col = _get_fallback_move(game_board, solver)
+        best_col = _get_fallback_move(session.board, session.solver)
         if best_col == -1:
             return -1
     return best_col 
@@ -55,10 +57,16 @@ def get_human_move(game_board: Board, player_symbol: str) -> int:
        
 
 def main():
-    game_board = Board()
+    session = GameSession(Board, tt_size_bytes=TT_SIZE_BYTES) # One solver (and trans table) for the whole game
+    game_board = session.board
+    if BOOK_PATH:
+        session.solver.load_book(BOOK_PATH)
+    if TT_PATH and os.path.exists(TT_PATH):
+        session.solver.load_table(TT_PATH)
     current_player_is_ai = True
     current_player_symbol = AI_SYMBOL if current_player_is_ai else HUMAN_SYMBOL
 
+    clock = TimeManager(MATCH_TIME, MATCH_INCREMENT) if MATCH_TIME is not None else None
     turn_count = 0
     game_over = False
     times = 0
@@ -69,17 +77,19 @@ def main():
         game_board.print_board() 
         if current_player_is_ai:
             ai_time = time.time()
-            solver = Solver(Board, max_cache_size=CACHE_SIZE)
-            chosen_col = get_ai_move(solver, game_board, depth)
+            time_limit = clock.budget(game_board.nb_moves()) if clock else TIME_LIMIT
+            chosen_col = get_ai_move(session, depth, time_limit)
             if chosen_col == -1:
                 print("AI failed to move. Stopping game.")
                 game_over = True
                 continue 
             ai_end_time = time.time()
             times += (ai_end_time - ai_time)
+            if clock:
+                clock.spend(ai_end_time - ai_time)
         else:
             chosen_col = get_human_move(game_board, current_player_symbol)
-        game_board.play_col(chosen_col)
+        session.play(chosen_col)
 
         player_who_just_moved_pos = game_board.current_position ^ game_board.mask
         if game_board.has_won(player_who_just_moved_pos):
@@ -97,9 +107,16 @@ def main():
 
      
         if not game_over:
+            if current_player_is_ai and PONDER:
+                session.start_pondering(depth)
             current_player_is_ai = not current_player_is_ai
             current_player_symbol = AI_SYMBOL if current_player_is_ai else HUMAN_SYMBOL
+    session.stop_pondering()
+    if TT_PATH:
+        session.solver.save_table(TT_PATH)
     print(f"Total AI Time: {times}")
+    if PONDER:
+        print(session.ponder_summary())
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,27 +1,28 @@
-import numpy as np
-from typing import Dict, Optional, Tuple, NamedTuple
+from typing import AsyncIterator, Generator, List, Optional, Tuple, NamedTuple
 from board import Board
 from MoveSorter import MoveSorter
+from trans_table import TranspositionTable, TTEntry, TT_EXACT, TT_LOWERBOUND, TT_UPPERBOUND
+from opening_book import OpeningBook
+from features import load_weights
+from telemetry import IterationStats, SearchStats, StatsSink, format_iteration
+import asyncio
+import threading
 import time
 import math
 
-TT_EXACT = 0
-TT_LOWERBOUND = 1
-TT_UPPERBOUND = 2
-
-class TTEntry(NamedTuple):
-    score: int
-    depth: int
-    flag: int
-    best_move_mask: Optional[int]
-
 class TimeLimitExceededError(Exception):
     "Exception for search timeout."
     pass
 
+class ColumnAnalysis(NamedTuple):
+    "Score of one root column, see Solver.analyze"
+    col: int
+    score: int
+    pv: Tuple[int, ...] # columns, starting with col
+
 class Solver:
 
-    def __init__(self, board_class: type[Board], max_cache_size=1_000_000):
+    def __init__(self, board_class: type[Board], tt_size_bytes=16 * 1024 * 1024):
         "Constructor: init values"
         # Constant
         self.Board = board_class
@@ -35,90 +36,501 @@ class Solver:
         self._start_time = 0.0
         self._time_limit = None
         self._time_limit_reached = False
+        self.last_completed_depth = 0
+        self._stop_event = None # optional threading.Event that cancels the search
+        self.time_check_interval = 1024 # nodes between clock checks (power of 2)
+        self.predict_iterations = True # skip an iteration that is predicted not to finish in time
+        self.verbose = True # print progress of solve()
+        self.sinks: List[StatsSink] = [] # receive IterationStats / SearchStats of every solve()
+        self.last_stats: Optional[SearchStats] = None # stats of the last solve()
 
         # Move Ordering Scores
         self.SCORE_PV_MOVE = 30000
         self.SCORE_TT_MOVE = 25000
         self.SCORE_WINNING_MOVE = 20000000
         self.SCORE_BLOCKING_MOVE = 15000000
+        self.SCORE_KILLER_MOVE = 20000 # second killer scores one less
+        self.SCORE_HISTORY_MAX = 10000 # history scores are capped below the killers
+
+        # Search only possible_non_losing_moves() in _negamax (proven loss when empty, forced moves extend)
+        self.prune_losing_moves = True
+        self.extend_forced_moves = True
+
+        # Ordering of the quiet moves: 'center' (column order only), 'history' (killers + history)
+        # or 'threats' (number of winning cells the move creates for the mover)
+        self.move_ordering = 'threats'
+
+        # Killer moves (2 per ply) and history (player, cell), filled by beta cutoffs in _negamax
+        self.killers = [[0, 0] for _ in range(self.W * self.H + 1)]
+        self.history = [[0] * (self.W * (self.H + 1)) for _ in range(2)]
+        self.beta_cutoffs = 0
+        self.cutoff_move_index = [0] * self.W # cutoffs by index of the move that caused them (0: first move searched)
+
+        # Heuristic weights: center, own threats, opponent threats, own 2-2, opponent 2-2 (heuristic_weights.json, see tune_weights.py)
+        self.heuristic_weights = load_weights()
+        self._incremental_eval = hasattr(board_class, 'evaluate') # e.g. EvalBoard keeps pattern counts on play/unplay
+
+        # Iterative deepening driver: 'pvs' (full window), 'aspiration' or 'mtdf'
+        self.search_driver = 'pvs'
+        self.aspiration_window = 10 # half width around the previous depth's score
+        self.driver_searches = 0 # root searches run by the driver (re-searches included)
+
+        # Search below the root: 'recursive' (_negamax) or 'iterative' (_negamax_iterative, same nodes without Python calls)
+        self.search_engine = 'recursive'
 
         # Column search order: center oriented 
         self.column_order = [self.W // 2 + (1 - 2 * (i % 2)) * (i + 1) // 2 for i in range(self.W)]
 
+        # One preallocated move list per ply (indexed by nb_moves()), reused by every node of that ply
+        self._move_buffers = [MoveSorter(self.W) for _ in range(self.W * self.H + 1)]
+
         # Transposition Table
-        self.trans_table: Dict[int, TTEntry] = {}
-        self.max_cache_size = max_cache_size
+        self.trans_table = TranspositionTable(tt_size_bytes)
+
+        # Mirror symmetry: a position and its mirror share one trans table entry
+        self.use_symmetry = False
+
+        # Opening book (see build_book.py), consulted before searching
+        self.book: Optional[OpeningBook] = None
+
+        # Exact endgame mode: scores are distance-to-win in [MIN_SCORE, MAX_SCORE], own table
+        self.exact_from_ply = 22 # use the exact solver once nb_moves() >= this (None: never)
+        self.exact_weak = False # weak solve: only win / draw / loss (-1, 0, 1)
+        self.exact_time_fraction = 0.5 # share of time_limit given to the exact solver before falling back
+        self.exact_table = TranspositionTable(max(1024 * 1024, tt_size_bytes // 4))
+        self.last_solve_exact = False # True if the last solve() returned an exact score
+        self._exact_running = False # the exact solver is running on part of the time limit
+        self._outer_time_limit = None # time limit of the whole solve() while the exact solver runs
 
     def reset_counters(self):
         "Reset cache hit-miss and node counter"
         self.node_count = 0
+        self.driver_searches = 0
+        self.beta_cutoffs = 0
+        self.cutoff_move_index = [0] * self.W
         self.cache_hits = 0
         self.cache_misses = 0
+        self.trans_table.reset_stats()
 
     def clear_cache(self):
         "Clear trans table"
         self.trans_table.clear()
     
+    def _log(self, *args, **kwargs):
+        "Print progress only when verbose"
+        if self.verbose:
+            print(*args, **kwargs)
+
     def _check_time_limit(self):
-        "Check if it over time limit"
-        if not self._time_limit_reached and self._time_limit is not None and (time.time() - self._start_time) >= self._time_limit:
+        "Check if it over time limit or the search was cancelled (reads the clock, see _negamax for the cheap check)"
+        if self._time_limit_reached:
+            return
+        if (self._time_limit is not None and (time.monotonic() - self._start_time) >= self._time_limit) \
+                or (self._stop_event is not None and self._stop_event.is_set()):
             self._time_limit_reached = True 
             raise TimeLimitExceededError()
 
-    def solve(self, board: Board, target_depth: int, time_limit: Optional[float] = None) -> Tuple[int, Optional[int]]:
-        "A solver function that take (board, depth and time_limit) and return (best_score, best_move)"
-        
-        # Init counter
+    def load_book(self, path: str):
+        "Use an opening book file for early positions"
+        self.book = OpeningBook(path)
+
+    def save_table(self, path: str):
+        "Write the trans table to a file, see TranspositionTable.save"
+        self.trans_table.save(path)
+
+    def load_table(self, path: str, use_mmap: bool = True):
+        "Warm-start from a saved trans table (it keeps its own size), see TranspositionTable.load"
+        self.trans_table = TranspositionTable.load(path, use_mmap)
+
+    def extend_time_limit(self, time_limit: Optional[float]):
+        "Restart the clock of a running search with a new limit (used when a ponder search becomes the real one)"
+        "A running exact solve gets exact_time_fraction of it, the fallback search the whole limit"
+        self._start_time = time.monotonic()
+        self._outer_time_limit = time_limit
+        if self._exact_running and time_limit is not None:
+            self._time_limit = time_limit * self.exact_time_fraction
+        else:
+            self._time_limit = time_limit
+
+    def _begin_search(self, time_limit: Optional[float], stop_event=None, new_generation: bool = True):
+        "Reset counters, clock and cancellation for a new search"
+        "new_generation=False: part of a larger search (e.g. one root child of ParallelSolver), keep the TT generation"
         self.reset_counters()
-        self._start_time = time.time()
+        self._start_time = time.monotonic()
+        self._time_limit = time_limit
+        self._time_limit_reached = False
+        self._stop_event = stop_event
+        if new_generation:
+            self.trans_table.new_search() # Older entries stay usable but become replaceable
+        self.last_completed_depth = 0
+
+    def evaluate(self, board: Board, target_depth: int, time_limit: Optional[float] = None, stop_event=None) -> Tuple[int, int]:
+        "Score of a position (no root move) by iterative deepening of full-window negamax"
+        "Return (score, completed_depth); the depth 0 score is always available"
+        self._begin_search(None, stop_event)
+        board = board.copy() # The search plays and unplays moves on its own copy
+        negamax = self._negamax_iterative if self.search_engine == 'iterative' else self._negamax
+        score = negamax(board, -math.inf, math.inf, 0)
         self._time_limit = time_limit
+        for current_depth in range(1, target_depth + 1):
+            try:
+                score = negamax(board, -math.inf, math.inf, current_depth)
+            except TimeLimitExceededError:
+                break
+            self.last_completed_depth = current_depth
+            if abs(score) == self.SCORE_WINNING_MOVE: # Proven win or loss
+                break
+        return score, self.last_completed_depth
+
+    def analyze(self, board: Board, target_depth: int, top_k: Optional[int] = None, time_limit: Optional[float] = None,
+                stop_event=None) -> List[ColumnAnalysis]:
+        "Multi-PV: a full-window score and PV for every legal column (or the top_k best), best first"
+        "Iterative deepening over the root moves in the order of the previous depth's scores, all sharing the trans table;"
+        "with top_k, the other moves are only tested with a null window against the kth best score and searched fully if they beat it."
+        "Return the results of the last completed depth (depth 1 always completes)"
+        self._begin_search(None, stop_event)
+        board = board.copy() # The search plays and unplays moves on its own copy
+        if board.nb_moves() >= self.W * self.H:
+            return []
+        negamax = self._negamax_iterative if self.search_engine == 'iterative' else self._negamax
+        possible = board.possible()
+        order = [col for col in self.column_order if possible & self.Board.column_mask(col)]
+        top_k = len(order) if top_k is None else max(1, min(top_k, len(order)))
+        results: List[ColumnAnalysis] = []
+        proven = {} # col -> result of a column already proven won or lost, kept without searching it again
+
+        for current_depth in range(1, target_depth + 1):
+            if current_depth == 2:
+                self._time_limit = time_limit
+            depth_results = []
+            try:
+                for col in order:
+                    result = proven.get(col)
+                    if result is None:
+                        move = (board.mask + self.Board.bottom_mask_col(col)) & self.Board.column_mask(col)
+                        board.play(move)
+                        if len(depth_results) < top_k: # Reported move: full window
+                            score = -negamax(board, -math.inf, math.inf, current_depth - 1)
+                        else:
+                            kth_score = depth_results[top_k - 1].score
+                            score = -negamax(board, -kth_score - 1, -kth_score, current_depth - 1) # Does col beat the kth best?
+                            if score > kth_score:
+                                score = -negamax(board, -math.inf, math.inf, current_depth - 1)
+                        result = ColumnAnalysis(col, score, (col,) + tuple(self.get_pv(board, current_depth - 1)))
+                        board.unplay(move)
+                    if len(depth_results) < top_k or result.score > depth_results[top_k - 1].score:
+                        depth_results.append(result)
+                        depth_results.sort(key=lambda result: -result.score) # Stable: ties keep the search order
+                        del depth_results[top_k:]
+            except TimeLimitExceededError:
+                break
+            results = depth_results
+            proven.update((result.col, result) for result in results if abs(result.score) == self.SCORE_WINNING_MOVE)
+            self.last_completed_depth = current_depth
+            reported = [result.col for result in results]
+            order = reported + [col for col in order if col not in reported] # Next depth: best first
+            if len(proven) == len(order):
+                break # Every column is a proven win or loss
+        return results
+
+    def solve(self, board: Board, target_depth: int, time_limit: Optional[float] = None, pv_move: int = 0,
+              stop_event=None) -> Tuple[int, Optional[int]]:
+        "A solver function that take (board, depth and time_limit) and return (best_score, best_move)"
+        "pv_move: optional expected best move (e.g. from the previous turn's PV) tried first at depth 1"
+        "stop_event: optional threading.Event, setting it aborts the search like a timeout"
+        iterations = self.iter_solve(board, target_depth, time_limit, pv_move, stop_event)
+        while True:
+            try:
+                next(iterations)
+            except StopIteration as finished:
+                return finished.value
+
+    def iter_solve(self, board: Board, target_depth: int, time_limit: Optional[float] = None, pv_move: int = 0,
+                   stop_event=None) -> Generator[IterationStats, None, Tuple[int, Optional[int]]]:
+        "solve() as a generator: yield the IterationStats of every completed depth, return solve()'s (score, move)"
+        "An immediate, book or exact answer is yielded once at depth 0. The caller may stop iterating at any time and keep"
+        "the last result; time spent between two next() calls counts against time_limit"
+
+        # Init counter
+        self._begin_search(time_limit, stop_event)
+        board = board.copy() # The search plays and unplays moves on its own copy
+        start_counters = self._counters()
 
         root_score, root_move = self._check_root_immediate_terminal(board) # Calculate root_score and root_move if possible
         if root_move is not None or root_score is not None: # If it is immediate terminal
-             print(f"Immediate result: Score={root_score}, Move Col={self.get_col_from_move(root_move)}")
-             return root_score if root_score is not None else 0, root_move # Return immediately
+             self._log(f"Immediate result: Score={root_score}, Move Col={self.get_col_from_move(root_move)}")
+             root_score = root_score if root_score is not None else 0
+             yield self._direct_result(board, root_score, root_move, start_counters)
+             return self._finish_solve(root_score, root_move, 'immediate', ()) # Return immediately
+
+        if self.book is not None: # Book positions return without searching
+            book_hit = self.book.lookup(board)
+            if book_hit is not None:
+                book_score, book_col = book_hit
+                self._log(f"Book move: Score={book_score}, Move Col={book_col}")
+                book_move = (board.mask + self.Board.bottom_mask_col(book_col)) & self.Board.column_mask(book_col)
+                yield self._direct_result(board, book_score, book_move, start_counters)
+                return self._finish_solve(book_score, book_move, 'book', ())
+
+        self.last_solve_exact = False
+        if self.exact_from_ply is not None and board.nb_moves() >= self.exact_from_ply:
+            exact_result = self._try_solve_exact(board)
+            if exact_result is not None:
+                yield self._direct_result(board, *exact_result, start_counters)
+                return self._finish_solve(*exact_result, 'exact', ())
 
         # Init values
         best_score_overall = -math.inf
         best_move_overall = 0
-        pv_move_from_last_iter = 0
         possible_root_moves = board.possible()
+        if self.prune_losing_moves: # Keep all moves when every one of them loses, a move must still be returned
+            possible_root_moves = board.possible_non_losing_moves() or possible_root_moves
+        pv_move_from_last_iter = pv_move if pv_move & possible_root_moves else 0
+
+        previous_iteration_nodes = 0
+        iteration_scores = []
+        iterations = []
 
         "Iterative deepening implementation"
         for current_depth in range(1, target_depth + 1): # depth: 1 -> target_depth
-            search_start_time = time.time()
-            print(f" Depth {current_depth}:", end="", flush=True)
+            search_start_time = time.monotonic()
+            self._age_history()
+            counters_before = self._counters()
 
             try:
                 # Calculate (score, move) for current depth
-                current_score, current_best_move = self._search_at_depth(
-                    board, current_depth, possible_root_moves, pv_move_from_last_iter
+                current_score, current_best_move = self._search_iteration(
+                    board, current_depth, possible_root_moves, pv_move_from_last_iter,
+                    iteration_scores[-2] if len(iteration_scores) >= 2 else best_score_overall # Same parity guess: scores alternate between odd and even depths
                 )
 
                 # If have found a move
                 if current_best_move != 0: # Update
                     best_score_overall = current_score
+                    iteration_scores.append(current_score)
                     best_move_overall = current_best_move
                     pv_move_from_last_iter = best_move_overall
+                    root_key, root_mirrored = self._tt_key(board)
+                    self._store_in_tt(root_key, current_score, current_depth, TT_EXACT, current_best_move, None, root_mirrored) # Root entry starts the PV
                 # If not   
                 elif best_move_overall == 0 and possible_root_moves != 0:
                     best_move_overall = possible_root_moves & -possible_root_moves # Best move assigned to the left-est column
                     pv_move_from_last_iter = best_move_overall
 
+                self.last_completed_depth = current_depth
+                stats = self._iteration_stats(board, current_depth, best_score_overall, best_move_overall,
+                                              search_start_time, counters_before, previous_iteration_nodes)
+                iterations.append(stats)
+                self._emit_iteration(stats)
+                yield stats
+
                 if self._report_progress_and_check_stop(current_depth, best_score_overall, best_move_overall, search_start_time):
                     break
 
+                iteration_nodes = stats.nodes
+                if current_depth < target_depth and not self._next_iteration_fits(search_start_time, iteration_nodes, previous_iteration_nodes):
+                    break
+                previous_iteration_nodes = iteration_nodes
+
                 if self._time_limit_reached:
-                    print(f" Timeout detected after depth {current_depth} search finished.")
+                    self._log(f" Timeout detected after depth {current_depth} search finished.")
                     break
             except TimeLimitExceededError:
-                print(f" Timeout exception reached solve loop at depth {current_depth}.")
+                self._log(f" Timeout exception reached solve loop at depth {current_depth}.")
                 break 
 
         if best_move_overall == 0 and possible_root_moves != 0: # if not -> play the left-est column
             best_move_overall = possible_root_moves & -possible_root_moves
 
-        return best_score_overall, best_move_overall
+        return self._finish_solve(best_score_overall, best_move_overall, 'search', tuple(iterations))
+
+    async def aiter_solve(self, board: Board, target_depth: int, time_limit: Optional[float] = None, pv_move: int = 0,
+                          stop_event=None) -> AsyncIterator[IterationStats]:
+        "iter_solve() for asyncio: each depth runs in the loop's default executor, the final answer is in last_stats"
+        "Leaving early (break, cancellation) sets stop_event and waits for a depth still running to stop at its next"
+        "clock check, so the Solver is free again once the iteration ends"
+        stop_event = stop_event or threading.Event()
+        iterations = self.iter_solve(board, target_depth, time_limit, pv_move, stop_event)
+        loop = asyncio.get_running_loop()
+        step = None
+        try:
+            while True:
+                step = loop.run_in_executor(None, next, iterations, None)
+                stats = await asyncio.shield(step) # Cancelling the consumer must not cancel step: the thread keeps running
+                step = None
+                if stats is None: # Search finished
+                    return
+                yield stats
+        finally:
+            stop_event.set()
+            if step is not None and not step.done(): # Cancelled while a depth runs in the executor thread
+                try:
+                    await asyncio.shield(step) # It stops within time_check_interval nodes, then runs _finish_solve
+                except Exception:
+                    pass
+            iterations.close()
+
+    def _counters(self) -> Tuple:
+        "Snapshot of the cumulative counters, see _iteration_stats"
+        return (self.node_count, self.cache_hits, self.cache_misses, self.trans_table.collisions,
+                self.trans_table.overwrites, self.beta_cutoffs, tuple(self.cutoff_move_index))
+
+    def _iteration_stats(self, board: Board, depth: int, score, move: int, iteration_start: float,
+                         counters_before: Tuple, previous_nodes: int) -> IterationStats:
+        "Counters of the iteration that just finished, as differences from the snapshot taken before it"
+        now = time.monotonic()
+        elapsed = now - iteration_start
+        nodes, hits, misses, collisions, overwrites, cutoffs = (
+            after - before for after, before in zip(self._counters()[:6], counters_before[:6]))
+        cutoff_index = tuple(after - before for after, before in zip(self.cutoff_move_index, counters_before[6]))
+        return IterationStats(depth, score, self.get_col_from_move(move), nodes, elapsed, now - self._start_time,
+                              nodes / elapsed if elapsed > 0 else 0.0, hits, misses, collisions, overwrites, cutoffs,
+                              cutoff_index, nodes / previous_nodes if previous_nodes else None, tuple(self.get_pv(board)))
+
+    def _direct_result(self, board: Board, score, move: Optional[int], start_counters: Tuple) -> IterationStats:
+        "The depth 0 IterationStats iter_solve() yields for an answer found without iterative deepening"
+        stats = self._iteration_stats(board, 0, score, move, self._start_time, start_counters, 0)
+        col = self.get_col_from_move(move)
+        return stats._replace(pv=(col,) if col != -1 else ())
+
+    def _emit_iteration(self, stats: IterationStats):
+        "Hand an iteration to the sinks (and to the console when verbose)"
+        if self.verbose:
+            print(format_iteration(stats))
+        for sink in self.sinks:
+            sink.on_iteration(stats)
+
+    def _finish_solve(self, score, move: Optional[int], source: str, iterations: Tuple[IterationStats, ...]) -> Tuple[int, Optional[int]]:
+        "Build last_stats, hand it to the sinks and return solve()'s (score, move)"
+        elapsed = time.monotonic() - self._start_time
+        self.last_stats = SearchStats(score, self.get_col_from_move(move), source, self.last_completed_depth,
+                                      self.node_count, elapsed, self.node_count / elapsed if elapsed > 0 else 0.0, iterations)
+        for sink in self.sinks:
+            sink.on_search(self.last_stats)
+        return score, move
+
+    def _try_solve_exact(self, board: Board) -> Optional[Tuple[int, int]]:
+        "Run the exact solver with part of the time budget, return None (and restore the clock) if it does not finish"
+        "The limit restored is the one current at the end, extend_time_limit() may have replaced it meanwhile"
+        self._outer_time_limit = self._time_limit
+        if self._time_limit is not None:
+            self._time_limit = self._time_limit * self.exact_time_fraction
+        self._exact_running = True
+        try:
+            score, move = self.solve_exact(board, weak=self.exact_weak)
+        except TimeLimitExceededError:
+            self._log(" Exact solve did not finish, falling back to heuristic search.")
+            self._time_limit_reached = False
+            return None
+        finally:
+            self._exact_running = False
+            self._time_limit = self._outer_time_limit
+        self.last_solve_exact = True
+        self._log(f"Exact result: Score={score}, Move Col={self.get_col_from_move(move)} ({self.node_count} nodes)")
+        return score, move
+
+    def solve_exact(self, board: Board, weak: bool = False) -> Tuple[int, int]:
+        "Exact (strong) or win/draw/loss (weak) value of the position with a best move, by null-window bisection"
+        "Score: (W*H + 1 - moves) // 2 for a win at the current player's moves-th stone, negative for a loss, 0 draw"
+        size = self.W * self.H
+        board = board.copy() # The search plays and unplays moves on its own copy
+        possible = board.possible()
+        winning_moves = board.winning_position() & possible
+        if winning_moves:
+            return 1 if weak else (size + 1 - board.nb_moves()) // 2, winning_moves & -winning_moves
+        non_losing = board.possible_non_losing_moves()
+        if not non_losing: # Every move loses at once: play anything, prefer a blocking one
+            forced = possible & board.opponent_winning_position()
+            move = forced & -forced if forced else possible & -possible
+            return -1 if weak else -((size - board.nb_moves()) // 2), move
+
+        score = self._exact_value(board, weak)
+
+        # Find a root move that reaches the score: the child must be worth <= -score
+        best_move = 0
+        for col in self.column_order:
+            move = non_losing & self.Board.column_mask(col)
+            if not move:
+                continue
+            child = board.copy()
+            child.play(move)
+            if -self._exact_negamax(child, -score, -score + 1) >= score:
+                best_move = move
+                break
+        return score, best_move or (non_losing & -non_losing)
+
+    def _exact_value(self, board: Board, weak: bool) -> int:
+        "Bisect the score window with null-window searches"
+        size = self.W * self.H
+        lo = max(self.Board.MIN_SCORE, -((size - board.nb_moves()) // 2))
+        hi = min(self.Board.MAX_SCORE, (size + 1 - board.nb_moves()) // 2)
+        if weak:
+            lo, hi = -1, 1
+        while lo < hi:
+            med = lo + (hi - lo) // 2
+            if med <= 0 and int(lo / 2) < med: med = int(lo / 2) # Try near zero first, most positions are close games
+            elif med >= 0 and hi // 2 > med: med = hi // 2
+            r = self._exact_negamax(board, med, med + 1) # Is the score > med ?
+            if r <= med:
+                hi = r
+            else:
+                lo = r
+        if weak: # Only the sign is meaningful
+            return (lo > 0) - (lo < 0)
+        return lo
+
+    def _exact_negamax(self, board: Board, alpha: int, beta: int) -> int:
+        "Exact negamax, requires that nobody has won and the current player cannot win at once"
+        self.node_count += 1
+        if not self.node_count & (self.time_check_interval - 1):
+            self._check_time_limit()
+        size = self.W * self.H
+
+        next_moves = board.possible_non_losing_moves()
+        if not next_moves: # Opponent wins on the next move whatever we do
+            return -((size - board.nb_moves()) // 2)
+        if board.nb_moves() >= size - 2: # Board fills up without a winner
+            return 0
+
+        lower = -((size - 2 - board.nb_moves()) // 2) # Opponent cannot win on their next move
+        if alpha < lower:
+            alpha = lower
+            if alpha >= beta: return alpha
+        upper = (size - 1 - board.nb_moves()) // 2 # We cannot win on our next move
+        board_key, _ = self._tt_key(board)
+        entry = self.exact_table.get(board_key)
+        if entry is not None:
+            if entry.flag == TT_UPPERBOUND and entry.score < upper:
+                upper = entry.score
+            elif entry.flag == TT_LOWERBOUND and entry.score > alpha:
+                alpha = entry.score
+                if alpha >= beta: return alpha
+        if beta > upper:
+            beta = upper
+            if alpha >= beta: return beta
+
+        # Order by number of winning cells created, then center first
+        moves = self._move_buffers[board.nb_moves()]
+        moves.reset()
+        for i in range(self.W - 1, -1, -1):
+            move = next_moves & self.Board.column_mask(self.column_order[i])
+            if move:
+                moves.add(move, self.Board.pop_count(self.Board.compute_winning_position(board.current_position | move, board.mask)))
+
+        next_move = moves.getNext()
+        while next_move:
+            board.play(next_move)
+            score = -self._exact_negamax(board, -beta, -alpha)
+            board.unplay(next_move)
+            if score >= beta:
+                self.exact_table.store(board_key, score, 0, TT_LOWERBOUND, next_move)
+                return score
+            if score > alpha:
+                alpha = score
+            next_move = moves.getNext()
+
+        self.exact_table.store(board_key, alpha, 0, TT_UPPERBOUND, 0)
+        return alpha
 
     def _check_root_immediate_terminal(self, board: Board) -> Tuple[Optional[int], Optional[int]]:
         "Check if current node is a terminal"
@@ -137,17 +549,56 @@ class Solver:
         
         return None, None # else (None, None)
 
-    def _search_at_depth(self, board: Board, depth: int, possible_moves: int, pv_move: int) -> Tuple[int, int]:
-        "Search at a specific depth"
-        
-        # Init values
-        alpha = -math.inf
-        beta = math.inf
+    def _search_iteration(self, board: Board, depth: int, possible_moves: int, pv_move: int, previous_score) -> Tuple[int, int]:
+        "One iterative deepening step with the selected driver, return (score, best_move)"
+        guess_is_usable = previous_score != -math.inf and abs(previous_score) < self.SCORE_WINNING_MOVE
+        if self.search_driver == 'aspiration' and guess_is_usable:
+            return self._aspiration_search(board, depth, possible_moves, pv_move, previous_score)
+        if self.search_driver == 'mtdf':
+            return self._mtdf_search(board, depth, possible_moves, pv_move, previous_score if guess_is_usable else 0)
+        self.driver_searches += 1
+        return self._search_at_depth(board, depth, possible_moves, pv_move)
+
+    def _aspiration_search(self, board: Board, depth: int, possible_moves: int, pv_move: int, guess: int) -> Tuple[int, int]:
+        "Search a window around guess, re-search with that side opened on a fail-low or fail-high"
+        alpha = guess - self.aspiration_window
+        beta = guess + self.aspiration_window
+        while True:
+            self.driver_searches += 1
+            score, move = self._search_at_depth(board, depth, possible_moves, pv_move, alpha, beta)
+            if score <= alpha: # Fail low: the real score is below the window
+                alpha = -math.inf
+            elif score >= beta: # Fail high: move is at least this good, try it first
+                beta = math.inf
+                pv_move = move or pv_move
+            else:
+                return score, move
+
+    def _mtdf_search(self, board: Board, depth: int, possible_moves: int, pv_move: int, guess: int) -> Tuple[int, int]:
+        "MTD(f): converge on the score with null-window searches only"
+        g = guess
+        lower, upper = -math.inf, math.inf
+        best_move = 0
+        while lower < upper:
+            beta = max(g, lower + 1)
+            self.driver_searches += 1
+            g, move = self._search_at_depth(board, depth, possible_moves, pv_move, beta - 1, beta)
+            if g < beta: # Fail low: g is an upper bound
+                upper = g
+            else: # Fail high: move reaches at least g
+                lower = g
+                best_move = pv_move = move
+        return g, best_move
+
+    def _search_at_depth(self, board: Board, depth: int, possible_moves: int, pv_move: int,
+                         alpha=-math.inf, beta=math.inf) -> Tuple[int, int]:
+        "Search at a specific depth inside the (alpha, beta) window, fail-soft"
         
         best_score = -math.inf
         best_move = 0
         
         move_count_root = 0
+        negamax = self._negamax_iterative if self.search_engine == 'iterative' else self._negamax
 
         moves = self._generate_and_sort_moves(board, possible_moves, pv_move=pv_move)
         next_move = moves.getNext()
@@ -162,19 +613,17 @@ class Solver:
 
             move_count_root += 1
             
-            board_copy = board.copy()
-            
-            board_copy.play(next_move)
+            board.play(next_move) # Make
             score = 0
 
             # PVS logic
             if move_count_root == 1: # The first time
-                score = -self._negamax(board_copy, -beta, -alpha, depth - 1)
+                score = -negamax(board, -beta, -alpha, depth - 1)
             else: # From second time 
-                score = -self._negamax(board_copy, -alpha - 1, -alpha, depth - 1) # Test with small (alpha, beta) window
+                score = -negamax(board, -alpha - 1, -alpha, depth - 1) # Test with small (alpha, beta) window
                 if score > alpha and score < beta: # If still in valid range
-                     self._check_time_limit()
-                     score = -self._negamax(board_copy, -beta, -alpha, depth - 1) # Research
+                     score = -negamax(board, -beta, -alpha, depth - 1) # Research
+            board.unplay(next_move) # Unmake
 
             # Update values
             if score > best_score:
@@ -191,15 +640,25 @@ class Solver:
             
         return best_score, best_move
 
+    def _next_iteration_fits(self, iteration_start: float, iteration_nodes: int, previous_nodes: int) -> bool:
+        "Predict the next iteration's time from the effective branching factor, False if it would overrun"
+        if not self.predict_iterations or self._time_limit is None or previous_nodes <= 0:
+            return True
+        now = time.monotonic()
+        ebf = min(max(1.0, iteration_nodes / previous_nodes), float(self.W)) # Warm-TT iterations can spike the ratio above the branching factor
+        predicted = (now - iteration_start) * ebf
+        remaining = self._time_limit - (now - self._start_time)
+        if predicted > remaining:
+            self._log(f"  Next depth predicted to take {predicted:.2f}s (EBF {ebf:.1f}), {remaining:.2f}s left. Stopping.")
+            return False
+        return True
+
     def _report_progress_and_check_stop(self, depth: int, score: int, move: int, depth_start_time: float) -> bool:
-        "Logging function"
-        depth_time = time.time() - depth_start_time
-        total_time = time.time() - self._start_time
-        move_col = self.get_col_from_move(move)
-        print(f" done. Best Move: Col {move_col + 1} Score: {score}. Time: {depth_time:.2f}s (Total: {total_time:.2f}s)")
+        "Return True if the search should stop after this depth (time is up or the score is a proven result)"
+        total_time = time.monotonic() - self._start_time
 
         if self._time_limit is not None and total_time >= self._time_limit: # Reach time limit -> break 
-            print(f"  Time limit ({self._time_limit}s) reached. Using results from depth {depth}.")
+            self._log(f"  Time limit ({self._time_limit}s) reached. Using results from depth {depth}.")
             return True
 
         max_possible_score = self.SCORE_WINNING_MOVE
@@ -211,19 +670,16 @@ class Solver:
                 is_certain_terminal_score = True
 
         if is_certain_terminal_score:
-            print(f"  Found exact terminal score ({score}) at depth {depth}. Stopping early.")
+            self._log(f"  Found exact terminal score ({score}) at depth {depth}. Stopping early.")
             return True
 
         return False 
 
-    def _prune_cache(self):
-        "Prune cache if reach trans table size"
-        if len(self.trans_table) > self.max_cache_size * 1.2:
-             keys_to_remove = list(self.trans_table.keys())[:int(self.max_cache_size * 0.2)]
-             for key in keys_to_remove:
-                 del self.trans_table[key]
-    
     def heuristic(self, board: Board) -> int:
+        if self._incremental_eval:
+            return board.evaluate(self.heuristic_weights)
+        center_w, threat_w, opp_threat_w, p22_w, opp_p22_w = self.heuristic_weights
+
         P = board.current_position # current player
         O = P ^ board.mask  # opponent
         M = board.mask
@@ -238,19 +694,19 @@ class Solver:
         center_col_index = self.W // 2
         center_col_mask = self.Board.column_mask(center_col_index)
         center_count = self.Board.pop_count(P & center_col_mask)
-        score += center_count * 3
+        score += center_count * center_w
 
         # 3 player - 1 empty
         player_threats_3p1e = self.Board.pop_count(player_winning_cells)
-        score += player_threats_3p1e * 5
+        score += player_threats_3p1e * threat_w
 
         # 3 opponent - 1 empty
         opponent_threats_3o1e = self.Board.pop_count(opponent_winning_cells)
-        score -= opponent_threats_3o1e * 6
+        score -= opponent_threats_3o1e * opp_threat_w
 
         # 2 player, 2 empty (Potential)
-        patterns22_mask = np.int64(0)
-        patterns22_mask_opponent = np.int64(0)
+        patterns22_mask = 0
+        patterns22_mask_opponent = 0
         shifts = [1, self.H, self.H + 1, self.H + 2] # dọc, chéo /, ngang, chéo \
         P_masked = P & self.Board.board_mask
         O_masked = O & self.Board.board_mask
@@ -280,10 +736,10 @@ class Solver:
             patterns22_mask_opponent |= E & O_s & E_2s & O_3s
 
         score_22 = self.Board.pop_count(patterns22_mask)
-        score += score_22 * 2
+        score += score_22 * p22_w
 
         score_22_opponent = self.Board.pop_count(patterns22_mask_opponent)
-        score -= score_22_opponent * 3
+        score -= score_22_opponent * opp_p22_w
 
         return score
 
@@ -291,14 +747,15 @@ class Solver:
                                  tt_best_move: int = 0, pv_move: int = 0) -> MoveSorter:
         
         # Init a MoveSorter by size
-        moves = MoveSorter(self.Board.WIDTH)
+        moves = self._move_buffers[board.nb_moves()]
+        moves.reset()
 
         winning_moves_now = board.winning_position() & possible_moves # immediate winning moves of current player
         opponent_pos = board.current_position ^ board.mask # get opponent mask
         opponent_winning_cells = self.Board.compute_winning_position(opponent_pos, board.mask) # immediate winning moves of opponent player
         playable_opponent_wins = opponent_winning_cells & possible_moves # immediate winning moves of opponent
         is_must_block = (playable_opponent_wins != 0) # True if opponent can win immediately
-        move_added_flags = np.int64(0) # bit-mask to check if a move is visited
+        move_added_flags = 0 # bit-mask to check if a move is visited
 
         "from PVS: winning > block opponent > other"
         if pv_move and (pv_move & possible_moves): # if have move from previous search and it is possible
@@ -318,8 +775,17 @@ class Solver:
             moves.add(tt_best_move, score)
             move_added_flags |= tt_best_move
 
-        "winning > block opp > ..."
-        for i in range(self.Board.WIDTH):
+        "Quiet move ordering strategy"
+        ordering = self.move_ordering
+        use_killers_history = ordering == 'history'
+        use_threats = ordering == 'threats'
+        if use_killers_history:
+            ply = board.nb_moves()
+            killer_1, killer_2 = self.killers[ply]
+            history = self.history[ply & 1]
+
+        "winning > block opp > killers > history (or threats) > ..."
+        for i in range(self.Board.WIDTH - 1, -1, -1): # Outer columns first: MoveSorter returns the last added of equal scores first
             col = self.column_order[i]
             move = possible_moves & self.Board.column_mask(col)
             if move and not (move & move_added_flags): # Visit possible moves which have not been visited
@@ -328,15 +794,60 @@ class Solver:
                     score = self.SCORE_WINNING_MOVE
                 elif is_must_block and (move & playable_opponent_wins):
                     score = self.SCORE_BLOCKING_MOVE
+                elif use_killers_history:
+                    if move == killer_1:
+                        score = self.SCORE_KILLER_MOVE
+                    elif move == killer_2:
+                        score = self.SCORE_KILLER_MOVE - 1
+                    else:
+                        score = min(history[int(move).bit_length() - 1], self.SCORE_HISTORY_MAX)
+                elif use_threats: # Winning cells the mover has after this move
+                    score = int(self.Board.compute_winning_position(board.current_position | move, board.mask)).bit_count()
                 moves.add(move, score)
 
         return moves
 
 
-    def _handle_tt_lookup(self, board_key: int, depth: int, alpha: int, beta: int) -> Tuple[bool, int, int, Optional[int], Optional[TTEntry]]:
-        "Look up values in trans table by board.key()"
+    def _tt_key(self, board: Board) -> Tuple[int, bool]:
+        "Trans table key of the board: board.key(), or the smaller of it and its mirror in symmetry mode"
+        "Return key, mirrored (True if the key is the mirrored position's)"
+        key = board.key()
+        if self.use_symmetry:
+            mirrored_key = self.Board.mirror(key)
+            if mirrored_key < key:
+                return mirrored_key, True
+        return key, False
+
+    def _record_cutoff(self, board: Board, move: int, depth: int):
+        "Remember a move that caused a beta cutoff: killer slot of its ply and history of (player, cell)"
+        move = int(move)
+        ply = board.nb_moves()
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[ply & 1][move.bit_length() - 1] += depth * depth
+
+    def _age_history(self):
+        "Halve the history scores between iterations so older cutoffs weigh less"
+        for table in self.history:
+            for i in range(len(table)):
+                table[i] >>= 1
+
+    def clear_move_ordering(self):
+        "Forget killers and history"
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        for table in self.history:
+            for i in range(len(table)):
+                table[i] = 0
+
+    def _handle_tt_lookup(self, board_key: int, depth: int, alpha: int, beta: int, mirrored: bool = False) -> Tuple[bool, int, int, Optional[int], Optional[TTEntry]]:
+        "Look up values in trans table by board.key() (or canonical key, see _tt_key)"
         "Return can_prune, alpha, beta, tt_best_move, cached_entry"
         cached_entry = self.trans_table.get(board_key) # Get entry by board.key()
+        if cached_entry is not None and mirrored and cached_entry.best_move_mask: # Stored move is in the mirrored orientation
+            cached_entry = cached_entry._replace(best_move_mask=self.Board.mirror(cached_entry.best_move_mask))
         cached_best_move = 0
 
         if cached_entry: # If found 
@@ -361,18 +872,19 @@ class Solver:
 
         return False, alpha, beta, cached_best_move, cached_entry
 
-    def _store_in_tt(self, board_key: int, score: int, depth: int, flag: int, best_move: int, cached_entry_obj: Optional[TTEntry]):
+    def _store_in_tt(self, board_key: int, score: int, depth: int, flag: int, best_move: int, cached_entry_obj: Optional[TTEntry], mirrored: bool = False):
         "Store to Trans table"
         if cached_entry_obj is None or depth >= cached_entry_obj.depth:
-             entry = TTEntry(score, depth, flag, best_move)
-             self.trans_table[board_key] = entry
-             self._prune_cache()
+             if mirrored and best_move: # Store the move of the canonical orientation
+                 best_move = self.Board.mirror(best_move)
+             self.trans_table.store(board_key, score, depth, flag, best_move)
 
     def _negamax(self, board: Board, alpha: int, beta: int, depth: int) -> int:
         "Negamax algorithm"
 
-        self._check_time_limit()
         self.node_count += 1
+        if not self.node_count & (self.time_check_interval - 1): # Read the clock only every time_check_interval nodes
+            self._check_time_limit()
 
         # Init values
         win_score = self.SCORE_WINNING_MOVE
@@ -394,8 +906,8 @@ class Solver:
         if alpha >= beta: return alpha # alpha-beta pruning 
 
         "Search by Trans table"
-        board_key = board.key()
-        can_prune, alpha, beta, tt_best_move, cached_entry = self._handle_tt_lookup(board_key, depth, alpha, beta)
+        board_key, mirrored = self._tt_key(board)
+        can_prune, alpha, beta, tt_best_move, cached_entry = self._handle_tt_lookup(board_key, depth, alpha, beta, mirrored)
         if can_prune:
             return cached_entry.score
 
@@ -403,6 +915,15 @@ class Solver:
         possible = board.possible()
         if possible == 0: 
             return 0
+        child_depth = depth - 1
+        if self.prune_losing_moves:
+            if winning_moves: # Win on this move
+                return win_score
+            possible = board.possible_non_losing_moves() # Drop moves that let the opponent win at once
+            if not possible: # Opponent has two threats or one on top of ours: proven loss
+                return loss_score
+            if self.extend_forced_moves and not possible & (possible - 1): # Forced move: search it at no depth cost
+                child_depth = depth
         moves = self._generate_and_sort_moves(board, possible, tt_best_move=tt_best_move)
 
         best_score = -math.inf
@@ -411,22 +932,19 @@ class Solver:
 
         next_move = moves.getNext()
         while next_move:
-            self._check_time_limit()
             move_count += 1
-            board_copy = board.copy()
-            board_copy.play(next_move)
+            board.play(next_move) # Make
             score = 0
             
             "PVS"
             if move_count == 1:
-                score = -self._negamax(board_copy, -beta, -alpha, depth - 1)
+                score = -self._negamax(board, -beta, -alpha, child_depth)
             else:
                 "Null windows search"
-                self._check_time_limit()
-                score = -self._negamax(board_copy, -alpha - 1, -alpha, depth - 1) # Null window
+                score = -self._negamax(board, -alpha - 1, -alpha, child_depth) # Null window
                 if score > alpha and score < beta:
-                    self._check_time_limit()
-                    score = -self._negamax(board_copy, -beta, -alpha, depth - 1) # Re-search
+                    score = -self._negamax(board, -beta, -alpha, child_depth) # Re-search
+            board.unplay(next_move) # Unmake
 
             "Update alpha vs beta"
             if score > best_score:
@@ -437,7 +955,11 @@ class Solver:
 
             "Pruning"
             if alpha >= beta:
-                self._store_in_tt(board_key, best_score, depth, TT_LOWERBOUND, best_move_found, cached_entry) # if pruning -> store lower bound
+                self.beta_cutoffs += 1
+                self.cutoff_move_index[move_count - 1] += 1
+                if self.move_ordering == 'history':
+                    self._record_cutoff(board, next_move, depth)
+                self._store_in_tt(board_key, best_score, depth, TT_LOWERBOUND, best_move_found, cached_entry, mirrored) # if pruning -> store lower bound
                 return best_score # Prune
 
             next_move = moves.getNext()
@@ -445,15 +967,184 @@ class Solver:
         "Store the result to TT"
         final_flag = TT_EXACT if best_score > original_alpha else TT_UPPERBOUND # if best_score > original_alpha -> store upper bound else exact
         move_to_store = best_move_found if final_flag == TT_EXACT else 0
-        self._store_in_tt(board_key, best_score, depth, final_flag, move_to_store, cached_entry)
+        self._store_in_tt(board_key, best_score, depth, final_flag, move_to_store, cached_entry, mirrored)
 
         return best_score
 
+    def _negamax_iterative(self, board: Board, alpha, beta, depth: int):
+        "Same search as _negamax (same nodes, scores, TT and ordering updates) as a loop over an explicit per-ply stack"
+        win_score = self.SCORE_WINNING_MOVE
+        loss_score = -win_score
+        size = self.W * self.H
+        check_mask = self.time_check_interval - 1
+        prune_losing_moves = self.prune_losing_moves
+        extend_forced_moves = self.extend_forced_moves
+        record_history = self.move_ordering == 'history'
+        cutoff_move_index = self.cutoff_move_index
+        tt_key = self._tt_key
+        tt_lookup = self._handle_tt_lookup
+        tt_store = self._store_in_tt
+        generate_moves = self._generate_and_sort_moves
+        heuristic = self.heuristic
+
+        # One frame per ply below the root of this call: window, depths, TT data, move list, best so far,
+        # move being searched and whether it is a PVS re-search
+        levels = size - board.nb_moves() + 1
+        alphas = [0] * levels
+        betas = [0] * levels
+        depths = [0] * levels
+        child_depths = [0] * levels
+        original_alphas = [0] * levels
+        keys = [0] * levels
+        mirrors = [False] * levels
+        entries = [None] * levels
+        move_lists = [None] * levels
+        best_scores = [0] * levels
+        best_moves = [0] * levels
+        move_counts = [0] * levels
+        moves = [0] * levels
+        researching = [False] * levels
+        sp = 0
+
+        while True:
+            "Enter a node searched with (alpha, beta, depth)"
+            self.node_count += 1
+            if not self.node_count & check_mask:
+                self._check_time_limit()
+
+            value = None # Set when the node is decided without searching children
+            while True: # Runs once, break leaves the prelude
+                if board.has_won(board.current_position ^ board.mask): # Opponent wins
+                    value = loss_score
+                    break
+                if board.nb_moves() >= size: # Draw
+                    value = 0
+                    break
+                winning_moves = board.winning_position() & board.possible()
+                if depth <= 0:
+                    value = win_score if winning_moves else heuristic(board)
+                    break
+
+                original_alpha = alpha
+                alpha = max(alpha, loss_score)
+                beta = min(beta, win_score)
+                if alpha >= beta:
+                    value = alpha
+                    break
+
+                board_key, mirrored = tt_key(board)
+                can_prune, alpha, beta, tt_best_move, cached_entry = tt_lookup(board_key, depth, alpha, beta, mirrored)
+                if can_prune:
+                    value = cached_entry.score
+                    break
+
+                possible = board.possible()
+                if possible == 0:
+                    value = 0
+                    break
+                child_depth = depth - 1
+                if prune_losing_moves:
+                    if winning_moves:
+                        value = win_score
+                        break
+                    possible = board.possible_non_losing_moves()
+                    if not possible:
+                        value = loss_score
+                        break
+                    if extend_forced_moves and not possible & (possible - 1):
+                        child_depth = depth
+
+                "Push the frame and descend into the first move with the full window"
+                move_list = generate_moves(board, possible, tt_best_move=tt_best_move)
+                move = move_list.getNext() # possible != 0, so there is one
+                alphas[sp] = alpha
+                betas[sp] = beta
+                depths[sp] = depth
+                child_depths[sp] = child_depth
+                original_alphas[sp] = original_alpha
+                keys[sp] = board_key
+                mirrors[sp] = mirrored
+                entries[sp] = cached_entry
+                move_lists[sp] = move_list
+                best_scores[sp] = -math.inf
+                best_moves[sp] = 0
+                move_counts[sp] = 1
+                moves[sp] = move
+                researching[sp] = False
+                board.play(move)
+                sp += 1
+                alpha, beta, depth = -beta, -alpha, child_depth
+                break
+            if value is None:
+                continue
+
+            "Return value to the parents until one of them has another child to search"
+            while True:
+                if sp == 0:
+                    return value
+                sp -= 1
+                move = moves[sp]
+                board.unplay(move)
+                score = -value
+                alpha = alphas[sp]
+                beta = betas[sp]
+
+                if move_counts[sp] > 1 and not researching[sp] and alpha < score < beta: # Null window failed high: re-search
+                    researching[sp] = True
+                    board.play(move)
+                    alpha, beta, depth = -beta, -alpha, child_depths[sp]
+                    sp += 1
+                    break
+                researching[sp] = False
+
+                if score > best_scores[sp]:
+                    best_scores[sp] = score
+                    best_moves[sp] = move
+                    if score > alpha:
+                        alpha = alphas[sp] = score
+
+                if alpha >= beta: # Beta cutoff
+                    self.beta_cutoffs += 1
+                    cutoff_move_index[move_counts[sp] - 1] += 1
+                    if record_history:
+                        self._record_cutoff(board, move, depths[sp])
+                    tt_store(keys[sp], best_scores[sp], depths[sp], TT_LOWERBOUND, best_moves[sp], entries[sp], mirrors[sp])
+                    value = best_scores[sp]
+                    continue
+
+                move = move_lists[sp].getNext()
+                if move: # Next move with a null window
+                    move_counts[sp] += 1
+                    moves[sp] = move
+                    board.play(move)
+                    alpha, beta, depth = -alpha - 1, -alpha, child_depths[sp]
+                    sp += 1
+                    break
+
+                best_score = best_scores[sp]
+                final_flag = TT_EXACT if best_score > original_alphas[sp] else TT_UPPERBOUND
+                tt_store(keys[sp], best_score, depths[sp], final_flag, best_moves[sp] if final_flag == TT_EXACT else 0,
+                         entries[sp], mirrors[sp])
+                value = best_score
+
+    def get_pv(self, board: Board, max_length: int = 42) -> List[int]:
+        "Follow best moves stored in the trans table from board, return the columns of the principal variation"
+        pv = []
+        board = board.copy()
+        while len(pv) < max_length:
+            key, mirrored = self._tt_key(board)
+            entry = self.trans_table.get(key)
+            if entry is None or not entry.best_move_mask:
+                break
+            move = self.Board.mirror(entry.best_move_mask) if mirrored else entry.best_move_mask
+            if not (move & board.possible()):
+                break
+            pv.append(self.get_col_from_move(move))
+            board.play(move)
+        return pv
+
     def get_col_from_move(self, move_mask: Optional[int]) -> int:
         "Utility function: get a column number from a bit-mask move"
         if not move_mask: 
             return -1
-        for col in range(self.W):
-            if move_mask & self.Board.column_mask(col):
-                return col
-        return -1
\ No newline at end of file
+        return self.Board.column_from_move(move_mask)
\ No newline at end of file
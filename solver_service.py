@@ -0,0 +1,196 @@
+"""
+Local solver service: JSON lines over TCP on localhost.
+
+Each request line is a move string ("4453") or a JSON object with "moves", or "position" and "mask",
+plus optional "depth", "time_limit" and "id" (see batch.py). Each answer is one JSON line, in the
+order of the requests of that connection. {"cmd": "stats"} returns the service counters.
+
+Searches run in forked worker processes that all probe and fill one shared trans table. Requests
+for the same position (Board.key()) and the same depth / time limit that arrive while it is being
+searched wait for that search instead of starting their own, and answers are kept in an LRU cache.
+Every search stops after max_time_limit seconds (10 by default), whatever depth was asked for.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from batch import board_from_request, parse_line, solve_fields
+from int_board import IntBoard
+from solver import Solver
+from trans_table import SharedTranspositionTable
+
+DEFAULT_PORT = 7744
+
+# Solver of the worker process (or of the single search thread when fork is not available)
+_worker_solver: Optional[Solver] = None
+
+def _init_worker(table: SharedTranspositionTable, worker_process: bool = True):
+    "Pool initializer: a Solver whose trans table is the shared one"
+    global _worker_solver
+    if worker_process: # Ctrl-C reaches the whole process group: only the service handles it, then stops the pool
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_solver = Solver(IntBoard, tt_size_bytes=1024 * 1024)
+    _worker_solver.verbose = False
+    _worker_solver.trans_table = table
+
+def _search(position: int, mask: int, depth: int, time_limit: Optional[float]) -> dict:
+    "Worker task: solve one position, return the answer fields"
+    board = IntBoard()
+    board.set_position(position, mask)
+    return solve_fields(_worker_solver, board, depth, time_limit)
+
+class SolverService:
+    "Request coalescing and LRU cache in front of a pool of searchers sharing one trans table"
+
+    def __init__(self, workers: int = 1, tt_size_bytes: int = 64 * 1024 * 1024, cache_size: int = 100000,
+                 default_depth: int = 12, max_depth: int = 42, max_time_limit: Optional[float] = 10.0,
+                 tt_path: Optional[str] = None):
+        "Constructor: allocate the shared table (from tt_path if it exists) and start the pool (forked processes where fork exists)"
+        if tt_path is not None and os.path.exists(tt_path):
+            self.table = SharedTranspositionTable.from_file(tt_path)
+        else:
+            self.table = SharedTranspositionTable(tt_size_bytes)
+        self.tt_path = tt_path
+        self.cache_size = cache_size
+        self.default_depth = default_depth
+        self.max_depth = max_depth
+        self.max_time_limit = max_time_limit
+        self._cache: OrderedDict = OrderedDict()
+        self._in_flight: Dict[Tuple, asyncio.Future] = {}
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.searches = 0
+        if 'fork' in multiprocessing.get_all_start_methods():
+            self._pool: Executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'),
+                                                       initializer=_init_worker, initargs=(self.table, True))
+        else: # One search thread: the Solver is not thread-safe
+            self._pool = ThreadPoolExecutor(1, initializer=_init_worker, initargs=(self.table, False))
+
+    def close(self):
+        "Stop the workers, then save the table to tt_path if given"
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        if self.tt_path is not None:
+            self.table.save(self.tt_path)
+
+    def stats(self) -> dict:
+        return {'requests': self.requests, 'cache_hits': self.cache_hits, 'coalesced': self.coalesced,
+                'searches': self.searches, 'cached': len(self._cache), 'in_flight': len(self._in_flight)}
+
+    async def query(self, request: dict) -> dict:
+        "Answer one request: from the cache, by joining a running search, or by a new search"
+        self.requests += 1
+        result = {'id': request['id']} if 'id' in request else {}
+        if 'moves' in request:
+            result['moves'] = str(request['moves'])
+        board, error = board_from_request(request)
+        if error is not None:
+            result['error'] = error
+            return result
+        try:
+            depth = min(int(request.get('depth', self.default_depth)), self.max_depth)
+            time_limit = request.get('time_limit', self.max_time_limit)
+            if time_limit is not None:
+                time_limit = float(time_limit)
+        except (ValueError, TypeError, OverflowError): # OverflowError: int(Infinity)
+            result['error'] = "'depth' must be an integer and 'time_limit' a number"
+            return result
+        if depth < 1 or (time_limit is not None and not (math.isfinite(time_limit) and time_limit > 0)):
+            result['error'] = "'depth' and 'time_limit' must be positive and finite"
+            return result
+        if time_limit is not None and self.max_time_limit is not None:
+            time_limit = min(time_limit, self.max_time_limit)
+        cache_key = (int(board.key()), depth, time_limit)
+
+        answer = self._cache.get(cache_key)
+        if answer is not None:
+            self._cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            result.update(answer, cached=True)
+            return result
+
+        search = self._in_flight.get(cache_key)
+        if search is None:
+            search = asyncio.ensure_future(self._run_search(cache_key, int(board.current_position), int(board.mask),
+                                                            depth, time_limit))
+            self._in_flight[cache_key] = search
+        else:
+            self.coalesced += 1
+        answer = await asyncio.shield(search) # A client going away must not cancel the others' search
+        result.update(answer, cached=False)
+        return result
+
+    async def _run_search(self, cache_key: Tuple, position: int, mask: int, depth: int, time_limit: Optional[float]) -> dict:
+        "Run a search on the pool and cache its answer"
+        self.searches += 1
+        self.table.advance_generation() # Once per search, here: the workers' new_search() leaves the shared age alone
+        try:
+            answer = await asyncio.get_running_loop().run_in_executor(self._pool, _search, position, mask, depth, time_limit)
+        finally:
+            del self._in_flight[cache_key]
+        self._cache[cache_key] = answer
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return answer
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        "Serve one client: one JSON answer per request line"
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode().strip()
+                if not line:
+                    continue
+                try:
+                    request = parse_line(line)
+                except json.JSONDecodeError as e:
+                    response = {'error': f"bad JSON: {e}"}
+                else:
+                    response = self.stats() if request.get('cmd') == 'stats' else await self.query(request)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(service: SolverService, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+    "Accept connections until cancelled"
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Solver service on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Connect 4 solver service (JSON lines over TCP)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--tt-mb', type=int, default=64, help="shared trans table size, MiB")
+    parser.add_argument('--tt-file', default=None, help="saved trans table loaded at start (sets the size) and saved on exit")
+    parser.add_argument('--cache-size', type=int, default=100000, help="answers kept in the LRU cache")
+    parser.add_argument('--depth', type=int, default=12, help="depth when a request gives none")
+    parser.add_argument('--max-time-limit', type=float, default=10.0,
+                        help="cap on (and default of) time_limit, seconds; bounds every search")
+    args = parser.parse_args()
+
+    service = SolverService(args.workers, args.tt_mb * 1024 * 1024, args.cache_size, args.depth,
+                            max_time_limit=args.max_time_limit, tt_path=args.tt_file)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+import logging
+from typing import Callable, List, NamedTuple, Optional, TextIO, Tuple
+
+class IterationStats(NamedTuple):
+    "Counters of one completed iterative deepening depth (counts are for this depth only)"
+    depth: int
+    score: float
+    best_col: int          # 0-based, -1 if no move
+    nodes: int
+    time: float            # seconds spent on this depth
+    total_time: float      # seconds since the search started
+    nps: float             # nodes per second over this depth
+    tt_hits: int
+    tt_misses: int
+    tt_collisions: int     # probes that found the bucket taken by other positions
+    tt_overwrites: int     # stores that evicted another position's entry
+    beta_cutoffs: int
+    cutoff_move_index: Tuple[int, ...]  # cutoffs caused by the 1st, 2nd, ... move searched at a node
+    ebf: Optional[float]   # nodes of this depth / nodes of the previous one, None at the first depth
+    pv: Tuple[int, ...]    # principal variation, 0-based columns
+
+class SearchStats(NamedTuple):
+    "Summary of one solve() call"
+    score: float
+    best_col: int
+    source: str            # 'immediate', 'book', 'exact' or 'search'
+    completed_depth: int
+    nodes: int             # all nodes, the unfinished last depth included
+    time: float
+    nps: float
+    iterations: Tuple[IterationStats, ...]
+
+    def to_dict(self) -> dict:
+        "Plain dict (iterations as dicts too), ready for json.dumps"
+        record = self._asdict()
+        record['iterations'] = [iteration._asdict() for iteration in self.iterations]
+        return record
+
+def format_iteration(stats: IterationStats) -> str:
+    "One console line for an iteration, as solve() used to print it"
+    first_move_rate = stats.cutoff_move_index[0] / stats.beta_cutoffs if stats.beta_cutoffs else 0.0
+    ebf = f"{stats.ebf:.1f}" if stats.ebf is not None else "-"
+    return (f" Depth {stats.depth}: Best Move: Col {stats.best_col + 1} Score: {stats.score}."
+            f" Time: {stats.time:.2f}s (Total: {stats.total_time:.2f}s) Nodes: {stats.nodes} ({stats.nps:.0f}/s, EBF {ebf})"
+            f" Cutoffs: {stats.beta_cutoffs} ({first_move_rate:.0%} on first move)")
+
+class StatsSink:
+    "Receives search telemetry; subclasses override the events they need"
+
+    def on_iteration(self, stats: IterationStats):
+        "Called after every completed depth of solve()"
+        pass
+
+    def on_search(self, stats: SearchStats):
+        "Called once when solve() returns"
+        pass
+
+class CallbackSink(StatsSink):
+    "Forward the events to plain functions"
+
+    def __init__(self, on_iteration: Optional[Callable[[IterationStats], None]] = None,
+                 on_search: Optional[Callable[[SearchStats], None]] = None):
+        "Constructor: either callback may be None"
+        self._on_iteration = on_iteration
+        self._on_search = on_search
+
+    def on_iteration(self, stats: IterationStats):
+        if self._on_iteration is not None:
+            self._on_iteration(stats)
+
+    def on_search(self, stats: SearchStats):
+        if self._on_search is not None:
+            self._on_search(stats)
+
+class LoggingSink(StatsSink):
+    "Write iterations and search summaries to a logging.Logger"
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        "Constructor: defaults to the 'connect4.search' logger"
+        self.logger = logger or logging.getLogger("connect4.search")
+        self.level = level
+
+    def on_iteration(self, stats: IterationStats):
+        if self.logger.isEnabledFor(self.level): # Skip the formatting when nobody listens
+            self.logger.log(self.level, format_iteration(stats))
+
+    def on_search(self, stats: SearchStats):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "Search done (%s): Col %d Score %s, depth %d, %d nodes in %.2fs",
+                            stats.source, stats.best_col + 1, stats.score, stats.completed_depth, stats.nodes, stats.time)
+
+class JsonLinesSink(StatsSink):
+    "Append one JSON object per event to a text stream"
+
+    def __init__(self, out: TextIO, iterations: bool = True):
+        "Constructor: iterations=False writes only the search summaries (which contain the iterations)"
+        self.out = out
+        self.iterations = iterations
+
+    def _write(self, event: str, record: dict):
+        record['event'] = event
+        self.out.write(json.dumps(record, default=float) + "\n")
+
+    def on_iteration(self, stats: IterationStats):
+        if self.iterations:
+            self._write('iteration', stats._asdict())
+
+    def on_search(self, stats: SearchStats):
+        self._write('search', stats.to_dict())
+
+class CollectingSink(StatsSink):
+    "Keep every SearchStats in memory (benchmarks, tests of a whole game)"
+
+    def __init__(self):
+        self.searches: List[SearchStats] = []
+
+    def on_search(self, stats: SearchStats):
+        self.searches.append(stats)
@@ -0,0 +1,31 @@
+from board import Board
+
+class TimeManager:
+    "Per-move time budgets from a match clock (total time plus optional increment per move)"
+
+    def __init__(self, total_time: float, increment: float = 0.0, min_time: float = 0.05, reserve: float = 0.5):
+        "Constructor: total_time and increment in seconds, reserve is never planned to be spent"
+        self.remaining = total_time
+        self.increment = increment
+        self.min_time = min_time
+        self.reserve = reserve
+
+    @staticmethod
+    def phase_weight(nb_moves: int) -> float:
+        "Share of the average budget by game phase: opening is cheap, middle game decides, endgame is solved exactly"
+        if nb_moves < 6:
+            return 0.6
+        if nb_moves < 22:
+            return 1.5
+        return 0.7
+
+    def budget(self, nb_moves: int) -> float:
+        "Seconds to spend on the move at ply nb_moves"
+        moves_left = max(1, (Board.WIDTH * Board.HEIGHT - nb_moves + 1) // 2) # moves still to play by this side
+        usable = max(0.0, self.remaining - self.reserve)
+        budget = usable / moves_left * self.phase_weight(nb_moves) + self.increment
+        return max(self.min_time, min(budget, usable * 0.5 + self.increment))
+
+    def spend(self, seconds: float):
+        "Charge a move's thinking time to the clock and add the increment"
+        self.remaining += self.increment - seconds
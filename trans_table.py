@@ -0,0 +1,293 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+TT_EXACT = 0
+TT_LOWERBOUND = 1
+TT_UPPERBOUND = 2
+
+class TTEntry(NamedTuple):
+    score: int
+    depth: int
+    flag: int
+    best_move_mask: Optional[int]
+
+EMPTY_KEY = -1
+SLOT_BYTES = 16 # 8 bytes key + 8 bytes packed data
+BUCKET_SLOTS = 2 # slot 0: depth-preferred, slot 1: always-replace
+
+TABLE_MAGIC = b'C4TT'
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct('<4sHBBQ') # magic, version, slots per bucket, age, bucket count; keys then data follow
+
+def _largest_prime_at_most(n: int) -> int:
+    "Bucket count is kept prime so key % nb_buckets mixes every column of the bitboard key"
+    def is_prime(m):
+        if m < 2: return False
+        i = 2
+        while i * i <= m:
+            if m % i == 0: return False
+            i += 1
+        return True
+    while n > 2 and not is_prime(n):
+        n -= 1
+    return max(n, 1)
+
+class TranspositionTable:
+    "Fixed-capacity transposition table stored in two preallocated int64 arrays"
+
+    def __init__(self, size_bytes: int = 16 * 1024 * 1024):
+        "Constructor: allocate the table for a memory budget in bytes"
+        self.nb_buckets = _largest_prime_at_most(size_bytes // (SLOT_BYTES * BUCKET_SLOTS))
+        self.size_bytes = self.nb_buckets * SLOT_BYTES * BUCKET_SLOTS
+        self.keys = array('q', [EMPTY_KEY]) * (self.nb_buckets * BUCKET_SLOTS)
+        self.data = array('q', [0]) * (self.nb_buckets * BUCKET_SLOTS)
+        self.age = 0 # search generation, entries from older generations are replaced first
+        self.collisions = 0 # get() misses on a bucket holding other positions
+        self.overwrites = 0 # store() calls that evicted another position's entry
+
+    def save(self, path: str):
+        "Write the table as a binary image (header, keys, data; int64 in native byte order) that load() can map"
+        tmp_path = path + ".tmp" # Written aside then renamed: path may be the file this table is mapped from
+        with open(tmp_path, 'wb') as f:
+            f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, BUCKET_SLOTS, self.age, self.nb_buckets))
+            f.write(self.keys.tobytes())
+            f.write(self.data.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, use_mmap: bool = True) -> 'TranspositionTable':
+        "Read a table written by save(); the table keeps the file's size"
+        "use_mmap: map the file copy-on-write, pages are read on first probe and stores never reach the file"
+        with open(path, 'rb') as f:
+            magic, version, slots, age, nb_buckets = TABLE_HEADER.unpack(f.read(TABLE_HEADER.size))
+            if magic != TABLE_MAGIC or version != TABLE_VERSION or slots != BUCKET_SLOTS:
+                raise ValueError(f"{path} is not a version {TABLE_VERSION} trans table file")
+            nb_slots = nb_buckets * BUCKET_SLOTS
+            table = cls.__new__(cls)
+            table.nb_buckets = nb_buckets
+            table.size_bytes = nb_buckets * SLOT_BYTES * BUCKET_SLOTS
+            table.age = age
+            table.collisions = 0
+            table.overwrites = 0
+            if use_mmap:
+                table._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) # Stays valid after the file is closed
+                view = memoryview(table._map)
+                table.keys = view[TABLE_HEADER.size:TABLE_HEADER.size + nb_slots * 8].cast('q')
+                table.data = view[TABLE_HEADER.size + nb_slots * 8:TABLE_HEADER.size + nb_slots * 16].cast('q')
+            else:
+                table.keys = array('q')
+                table.keys.fromfile(f, nb_slots)
+                table.data = array('q')
+                table.data.fromfile(f, nb_slots)
+        return table
+
+    def entries(self) -> Iterator[Tuple[int, int]]:
+        "(key, packed data) of every occupied slot"
+        data = self.data
+        for i, key in enumerate(self.keys):
+            if key != EMPTY_KEY:
+                yield key, data[i]
+
+    def new_search(self):
+        "Start a new search generation (entries are kept but become replaceable)"
+        self.age = (self.age + 1) & 0xFF
+
+    @staticmethod
+    def pack(score: int, depth: int, flag: int, move: Optional[int], age: int = 0) -> int:
+        "Pack into one int64: score | age(8) | depth(8) | flag(2) | move bit index + 1 (6)"
+        move_index = int(move).bit_length() if move else 0
+        return (int(score) << 24) | (age << 16) | (depth << 8) | (flag << 6) | move_index
+
+    @staticmethod
+    def unpack(value: int) -> TTEntry:
+        "Unpack an int64 slot into a TTEntry"
+        move_index = value & 63
+        return TTEntry(value >> 24, (value >> 8) & 0xFF, (value >> 6) & 3, (1 << (move_index - 1)) if move_index else 0)
+
+    def reset_stats(self):
+        "Zero the collision and overwrite counters"
+        self.collisions = 0
+        self.overwrites = 0
+
+    def clear(self):
+        "Empty the table without reallocating"
+        self.keys[:] = array('q', [EMPTY_KEY]) * len(self.keys)
+
+    def get(self, key: int) -> Optional[TTEntry]:
+        "Return the entry stored for key, or None"
+        key = int(key)
+        i = (key % self.nb_buckets) * BUCKET_SLOTS
+        keys = self.keys
+        if keys[i] == key:
+            return self.unpack(self.data[i])
+        if keys[i + 1] == key:
+            return self.unpack(self.data[i + 1])
+        if keys[i] != EMPTY_KEY:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, score: int, depth: int, flag: int, move: Optional[int]):
+        "Store an entry: deeper (or equal) searches and stale entries take the depth-preferred slot, the rest the always-replace slot"
+        key = int(key)
+        i = (key % self.nb_buckets) * BUCKET_SLOTS
+        keys = self.keys
+        data = self.data
+        age = self.age
+        value = self.pack(score, depth, flag, move, age)
+        old = data[i]
+
+        if keys[i] == key: # Same position in the depth-preferred slot
+            if depth >= (old >> 8) & 0xFF:
+                data[i] = value
+            else: # Keep the deeper result, just mark it as current
+                data[i] = (old & ~(0xFF << 16)) | (age << 16)
+            return
+
+        if keys[i + 1] != EMPTY_KEY and keys[i + 1] != key: # Whichever way it goes, slot 1 loses its entry
+            self.overwrites += 1
+        if keys[i] == EMPTY_KEY or depth >= (old >> 8) & 0xFF or (old >> 16) & 0xFF != age:
+            if keys[i] != EMPTY_KEY: # Demote the old entry to the always-replace slot
+                keys[i + 1] = keys[i]
+                data[i + 1] = data[i]
+            keys[i] = key
+            data[i] = value
+        else:
+            keys[i + 1] = key
+            data[i + 1] = value
+
+def merge_tables(tables: Iterable[TranspositionTable], size_bytes: Optional[int] = None) -> TranspositionTable:
+    "Merge tables into a new one (size_bytes defaults to the largest input)"
+    "A position found in several tables keeps its deepest entry (exact bounds win ties), then deeper positions win the buckets"
+    tables = list(tables)
+    best = {}
+    for table in tables:
+        for key, value in table.entries():
+            old = best.get(key)
+            if old is None or ((value >> 8) & 0xFF, (value >> 6) & 3 == TT_EXACT) > ((old >> 8) & 0xFF, (old >> 6) & 3 == TT_EXACT):
+                best[key] = value
+
+    merged = TranspositionTable(size_bytes or max(table.size_bytes for table in tables))
+    for key, value in sorted(best.items(), key=lambda item: (item[1] >> 8) & 0xFF): # Shallow first: deeper stores take slot 0
+        entry = TranspositionTable.unpack(value)
+        merged.store(key, entry.score, entry.depth, entry.flag, entry.best_move_mask)
+    return merged
+
+class SharedTranspositionTable(TranspositionTable):
+    "Table in an anonymous shared mapping: forked worker processes probe and store into the same memory"
+    "Slots hold key ^ data (lockless hashing), so a slot torn by a concurrent store reads as a miss, never as a wrong entry"
+    "The generation (age) is shared too: workers' new_search() does nothing, the coordinating process calls advance_generation()"
+
+    def __init__(self, size_bytes: int = 16 * 1024 * 1024):
+        "Constructor: map shared memory for a memory budget in bytes"
+        self.nb_buckets = _largest_prime_at_most(size_bytes // (SLOT_BYTES * BUCKET_SLOTS))
+        self.size_bytes = self.nb_buckets * SLOT_BYTES * BUCKET_SLOTS
+        nb_slots = self.nb_buckets * BUCKET_SLOTS
+        self._map = mmap.mmap(-1, 8 + nb_slots * SLOT_BYTES) # Anonymous maps are shared with forked children
+        view = memoryview(self._map)
+        self._header = view[:8].cast('q') # [0]: generation
+        self.keys = view[8:8 + nb_slots * 8].cast('q')
+        self.data = view[8 + nb_slots * 8:].cast('q')
+        self.collisions = 0
+        self.overwrites = 0
+        self.clear()
+
+    @property
+    def age(self) -> int:
+        return self._header[0]
+
+    @age.setter
+    def age(self, value: int):
+        self._header[0] = value
+
+    def new_search(self):
+        "No-op: one worker's search must not make the entries of the others stale, see advance_generation"
+        pass
+
+    def advance_generation(self):
+        "Start a new search generation for every process sharing the table (call once per logical search)"
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self):
+        "Empty the table: EMPTY_KEY ^ 0 decodes as empty"
+        self.keys[:] = array('q', [EMPTY_KEY]) * len(self.keys)
+        self.data[:] = array('q', [0]) * len(self.data)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'SharedTranspositionTable':
+        "Shared copy of a table saved by TranspositionTable.save (same size)"
+        table = TranspositionTable.load(path, use_mmap=False)
+        shared = cls(table.size_bytes)
+        shared.age = table.age
+        shared.data[:] = table.data
+        shared.keys[:] = array('q', (key ^ value for key, value in zip(table.keys, table.data)))
+        return shared
+
+    def entries(self) -> Iterator[Tuple[int, int]]:
+        "(key, packed data) of every occupied slot"
+        data = self.data
+        for i, stored in enumerate(self.keys):
+            value = data[i]
+            if stored ^ value != EMPTY_KEY:
+                yield stored ^ value, value
+
+    def save(self, path: str):
+        "Save in the plain TranspositionTable format"
+        table = TranspositionTable.__new__(TranspositionTable)
+        table.nb_buckets = self.nb_buckets
+        table.age = self.age
+        table.data = self.data
+        table.keys = array('q', (stored ^ value for stored, value in zip(self.keys, self.data)))
+        TranspositionTable.save(table, path)
+
+    def get(self, key: int) -> Optional[TTEntry]:
+        "Return the entry stored for key, or None"
+        key = int(key)
+        i = (key % self.nb_buckets) * BUCKET_SLOTS
+        keys = self.keys
+        data = self.data
+        value = data[i]
+        if keys[i] ^ value == key:
+            return self.unpack(value)
+        value = data[i + 1]
+        if keys[i + 1] ^ value == key:
+            return self.unpack(value)
+        if keys[i] ^ data[i] != EMPTY_KEY:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, score: int, depth: int, flag: int, move: Optional[int]):
+        "Same replacement policy as TranspositionTable.store, on decoded keys"
+        key = int(key)
+        i = (key % self.nb_buckets) * BUCKET_SLOTS
+        keys = self.keys
+        data = self.data
+        age = self.age
+        value = self.pack(score, depth, flag, move, age)
+        old = data[i]
+        key_0 = keys[i] ^ old
+        key_1 = keys[i + 1] ^ data[i + 1]
+
+        if key_0 == key:
+            if depth >= (old >> 8) & 0xFF:
+                data[i] = value
+                keys[i] = key ^ value
+            else:
+                refreshed = (old & ~(0xFF << 16)) | (age << 16)
+                data[i] = refreshed
+                keys[i] = key ^ refreshed
+            return
+
+        if key_1 != EMPTY_KEY and key_1 != key:
+            self.overwrites += 1
+        if key_0 == EMPTY_KEY or depth >= (old >> 8) & 0xFF or (old >> 16) & 0xFF != age:
+            if key_0 != EMPTY_KEY:
+                data[i + 1] = old
+                keys[i + 1] = key_0 ^ old
+            data[i] = value
+            keys[i] = key ^ value
+        else:
+            data[i + 1] = value
+            keys[i + 1] = key ^ value
@@ -0,0 +1,137 @@
+"""
+Texel tuning of the heuristic weights against game outcomes.
+
+  python tune_weights.py games -o games.npz --games 300   # self-play, every position labelled with the game result
+  python tune_weights.py tune games.npz                   # fit the weights and write heuristic_weights.json
+
+The error is the mean squared difference between the result (1 win, 0.5 draw, 0 loss for the
+player to move) and sigmoid(K * heuristic). K is fitted once for the starting weights, then every
+weight is moved by +-1 while that lowers the error. Only quiet positions are used: no immediate
+win for the player to move and nothing to block.
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+from eval_board import EvalBoard
+from features import FEATURE_NAMES, FEATURE_SIGNS, WEIGHTS_FILE, batch_features, load_weights, save_weights
+from solver import Solver
+
+def play_game(solver: Solver, rng: random.Random, depth: int, random_plies: int, epsilon: float):
+    "One self-play game, return ([(position, mask)] of the quiet positions with the player to move, [player to move], winner or None)"
+    board = EvalBoard()
+    positions, players = [], []
+    while board.nb_moves() < board.WIDTH * board.HEIGHT:
+        possible = board.possible()
+        quiet = not (board.winning_position() & possible) and not (board.opponent_winning_position() & possible)
+        if quiet:
+            positions.append((int(board.current_position), int(board.mask)))
+            players.append(board.nb_moves() & 1)
+        non_losing = board.possible_non_losing_moves() if not board.winning_position() & possible else 0
+        if board.nb_moves() < random_plies or (non_losing and rng.random() < epsilon):
+            choices = non_losing or possible
+            col = rng.choice([c for c in range(board.WIDTH) if choices & board.column_mask(c)])
+        else:
+            _, move = solver.solve(board, depth)
+            col = solver.get_col_from_move(move)
+        board.play_col(col)
+        if board.has_won(board.current_position ^ board.mask):
+            return positions, players, (board.nb_moves() - 1) & 1
+    return positions, players, None
+
+def generate_games(path: str, games: int, depth: int, random_plies: int, epsilon: float, seed: int):
+    "Play games and save positions, masks and results (for the player to move) as .npz"
+    rng = random.Random(seed)
+    solver = Solver(EvalBoard)
+    solver.verbose = False
+    all_positions, all_masks, results = [], [], []
+    start = time.time()
+    for game in range(games):
+        positions, players, winner = play_game(solver, rng, depth, random_plies, epsilon)
+        for (position, mask), player in zip(positions, players):
+            all_positions.append(position)
+            all_masks.append(mask)
+            results.append(0.5 if winner is None else float(player == winner))
+        if (game + 1) % 50 == 0:
+            print(f" {game + 1} games, {len(results)} positions ({time.time() - start:.0f}s)", flush=True)
+    np.savez_compressed(path, positions=np.array(all_positions, dtype=np.uint64),
+                        masks=np.array(all_masks, dtype=np.uint64), results=np.array(results))
+    print(f"Wrote {len(results)} positions of {games} games to {path}")
+
+def texel_error(features: np.ndarray, results: np.ndarray, weights, k: float) -> float:
+    "Mean squared error of sigmoid(k * heuristic) against the results"
+    scores = features @ (FEATURE_SIGNS * np.asarray(weights, dtype=np.int64))
+    return float(np.mean((results - 1.0 / (1.0 + np.exp(-k * scores))) ** 2))
+
+def fit_k(features: np.ndarray, results: np.ndarray, weights) -> float:
+    "Scale of the sigmoid that fits the starting weights best (golden section search on log k)"
+    lo, hi = np.log(1e-4), np.log(10.0)
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(60):
+        a = hi - ratio * (hi - lo)
+        b = lo + ratio * (hi - lo)
+        if texel_error(features, results, weights, np.exp(a)) < texel_error(features, results, weights, np.exp(b)):
+            hi = b
+        else:
+            lo = a
+    return float(np.exp((lo + hi) / 2))
+
+def tune(features: np.ndarray, results: np.ndarray, weights, k: float, max_rounds: int = 100):
+    "Texel local search: move each weight by +-1 (weights stay >= 0) while the error drops"
+    weights = list(weights)
+    best = texel_error(features, results, weights, k)
+    for round_index in range(max_rounds):
+        improved = False
+        for i in range(len(weights)):
+            for step in (1, -1):
+                candidate = weights[:]
+                candidate[i] += step
+                if candidate[i] < 0:
+                    continue
+                error = texel_error(features, results, candidate, k)
+                if error < best:
+                    weights, best, improved = candidate, error, True
+                    break
+        print(f" round {round_index + 1}: {dict(zip(FEATURE_NAMES, weights))} error {best:.6f}")
+        if not improved:
+            break
+    return weights, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Texel tuning of the heuristic weights")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    games = commands.add_parser('games', help="generate labelled positions by self-play")
+    games.add_argument('-o', '--output', default="games.npz")
+    games.add_argument('--games', type=int, default=300)
+    games.add_argument('--depth', type=int, default=4, help="search depth of the players")
+    games.add_argument('--random-plies', type=int, default=6, help="random opening moves per game")
+    games.add_argument('--epsilon', type=float, default=0.1, help="chance of a random non-losing move later on")
+    games.add_argument('--seed', type=int, default=1)
+
+    fit = commands.add_parser('tune', help="fit the weights and write the config")
+    fit.add_argument('games', help=".npz written by the games command")
+    fit.add_argument('--weights', default=WEIGHTS_FILE, help="config to start from and write back")
+    fit.add_argument('--dry-run', action='store_true', help="do not write the config")
+    args = parser.parse_args()
+
+    if args.command == 'games':
+        generate_games(args.output, args.games, args.depth, args.random_plies, args.epsilon, args.seed)
+        return
+
+    data = np.load(args.games)
+    features = batch_features(data['positions'], data['masks'])
+    results = data['results']
+    start_weights = load_weights(args.weights)
+    k = fit_k(features, results, start_weights)
+    start_error = texel_error(features, results, start_weights, k)
+    print(f"{len(results)} positions, K = {k:.5f}, start {dict(zip(FEATURE_NAMES, start_weights))} error {start_error:.6f}")
+    weights, error = tune(features, results, start_weights, k)
+    print(f"Tuned {dict(zip(FEATURE_NAMES, weights))}: error {start_error:.6f} -> {error:.6f}")
+    if not args.dry_run:
+        save_weights(weights, args.weights)
+        print(f"Weights written to {args.weights}")
+
+if __name__ == "__main__":
+    main()